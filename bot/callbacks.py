@@ -0,0 +1,125 @@
+import logging
+from inspect import Parameter, signature
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telebot.types import CallbackQuery
+
+logger = logging.getLogger(__name__)
+
+# версия формата: кнопки старого формата (из давних сообщений) не маршрутизируются
+VERSION = "1"
+# ограничение Telegram на размер callback_data
+MAX_SIZE = 64
+
+"""Коды действий:"""
+
+RANDOM_RECIPE = "r"
+MENU_DAY = "m"
+RECIPE = "rc"
+CATEGORIES = "c"
+CATEGORY = "ct"
+CATEGORIES_CLEAR = "cx"
+CATEGORIES_SEND = "cs"
+INGREDIENTS = "i"
+INGREDIENTS_ADD = "ia"
+LETTER = "l"
+INGREDIENT = "it"
+INGREDIENTS_CLEAR = "ix"
+INGREDIENTS_FIND = "if"
+INGREDIENTS_SEND = "is"
+
+"""Режимы поиска (аргумент CATEGORIES_SEND и INGREDIENTS_SEND):"""
+
+ASIDE = 0
+SELECT = 1
+
+
+def encode(action: str, *args: int) -> str:
+    """
+    Функция для получения callback_data: версия, код действия и числовые аргументы.
+
+    Пример: encode(CATEGORY, 12) -> '1ct:12'.
+    """
+
+    data = VERSION + action
+    if args:
+        data += ":" + ",".join(str(arg) for arg in args)
+    if len(data.encode()) > MAX_SIZE:
+        raise ValueError(f"Callback data is longer than {MAX_SIZE} bytes: {data}")
+    return data
+
+
+def decode(data: Optional[str]) -> Optional[Tuple[str, List[int]]]:
+    """Функция для разбора callback_data. None - если формат или версия не совпадают."""
+
+    if not data or data[0] != VERSION:
+        return None
+    action, _, args = data[1:].partition(":")
+    try:
+        return action, [int(arg) for arg in args.split(",")] if args else list()
+    except ValueError:
+        return None
+
+
+def get_args_count(handler: Callable[..., None]) -> Tuple[int, float]:
+    """Функция для получения допустимого числа аргументов обработчика (без callback)."""
+
+    parameters = signature(handler).parameters.values()
+    if any(parameter.kind is Parameter.VAR_POSITIONAL for parameter in parameters):
+        max_args = float("inf")
+    else:
+        max_args = sum(
+            parameter.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+            for parameter in parameters
+        ) - 1
+    min_args = sum(
+        parameter.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+        and parameter.default is Parameter.empty
+        for parameter in parameters
+    ) - 1
+    return min_args, max_args
+
+
+class CallbackRouter:
+    """
+    Маршрутизатор callback_query по коду действия.
+
+    Обработчик выбирается поиском в словаре, поэтому стоимость маршрутизации
+    не зависит от числа действий и порядка их регистрации. Обработчик
+    получает callback и числовые аргументы из callback_data; кнопки с
+    другим числом аргументов передаются обработчику неизвестных кнопок.
+    """
+
+    def __init__(self):
+        # код действия: обработчик, минимальное и максимальное число аргументов
+        self._handlers: Dict[str, Tuple[Callable[..., None], int, float]] = dict()
+        self._fallback: Optional[Callable[[CallbackQuery], None]] = None
+
+    def action(self, action: str) -> Callable:
+        """Декоратор для регистрации обработчика действия."""
+
+        def decorator(handler: Callable[..., None]) -> Callable[..., None]:
+            if action in self._handlers:
+                raise ValueError(f"Handler for action {action!r} is already registered")
+            self._handlers[action] = (handler, *get_args_count(handler))
+            return handler
+
+        return decorator
+
+    def fallback(self, handler: Callable[[CallbackQuery], None]) -> Callable[[CallbackQuery], None]:
+        """Декоратор для регистрации обработчика неизвестных (устаревших) кнопок."""
+
+        self._fallback = handler
+        return handler
+
+    def dispatch(self, callback: CallbackQuery) -> None:
+        """Вызов обработчика по callback_data."""
+
+        decoded = decode(callback.data)
+        route = self._handlers.get(decoded[0]) if decoded else None
+        if route is not None and route[1] <= len(decoded[1]) <= route[2]:
+            route[0](callback, *decoded[1])
+        elif self._fallback is not None:
+            self._fallback(callback)
+        else:
+            logger.warning("Unknown callback data: %r", callback.data)
@@ -0,0 +1,104 @@
+import logging
+from dataclasses import dataclass, field, replace
+from threading import Lock, Thread
+from time import monotonic
+from typing import Dict, Iterable, List, Optional
+
+from client import ApiClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Неизменяемый снимок каталога: категории и ингредиенты по первым буквам."""
+
+    categories: List[dict]
+    ingredients: Dict[str, List[dict]]
+    version: Optional[str]
+    loaded_at: float
+    ingredient_names: Dict[int, str] = field(default_factory=dict)
+    ingredient_letters: Dict[int, str] = field(default_factory=dict)
+
+    @classmethod
+    def create(
+        cls, categories: List[dict], ingredients: Dict[str, List[dict]], version: Optional[str]
+    ) -> "CatalogSnapshot":
+        """Снимок каталога со справочниками названий и букв ингредиентов по id."""
+
+        ingredient_names = dict()
+        ingredient_letters = dict()
+        for symbol, bucket in ingredients.items():
+            for ingredient in bucket:
+                ingredient_names[ingredient.get("id")] = ingredient.get("name")
+                ingredient_letters[ingredient.get("id")] = symbol
+        return cls(
+            categories, ingredients, version, monotonic(), ingredient_names, ingredient_letters
+        )
+
+    def get_ingredient_names(self, ingredients: Iterable[int]) -> List[str]:
+        """Названия ингредиентов по id (по алфавиту)."""
+
+        return sorted(
+            self.ingredient_names[ingredient_id]
+            for ingredient_id in ingredients
+            if ingredient_id in self.ingredient_names
+        )
+
+
+class Catalog:
+    """
+    Каталог категорий и ингредиентов для бота.
+
+    Загружается при первом обращении и обновляется в фоне, когда снимок
+    старше ttl секунд. Обновление - условный запрос по ETag (версии каталога):
+    если каталог не менялся, данные повторно не загружаются. Обработчики
+    всегда получают целостный снимок.
+    """
+
+    def __init__(self, api_client: ApiClient, ttl: float = 300):
+        self.api_client = api_client
+        self.ttl = ttl
+        self._lock = Lock()
+        self._refreshing = False
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def load(self, snapshot: Optional[CatalogSnapshot] = None) -> CatalogSnapshot:
+        """Загрузка каталога из API (если он изменился с момента снимка snapshot)."""
+
+        ingredients, version = self.api_client.get_ingredients_if_changed(
+            snapshot.version if snapshot else None
+        )
+        if ingredients is None:
+            new_snapshot = replace(snapshot, version=version, loaded_at=monotonic())
+        else:
+            new_snapshot = CatalogSnapshot.create(
+                self.api_client.get_categories(), ingredients, version
+            )
+        self._snapshot = new_snapshot
+        return new_snapshot
+
+    def refresh(self) -> None:
+        """Обновление каталога (выполняется в фоновом потоке)."""
+
+        try:
+            self.load(self._snapshot)
+        except Exception:
+            logger.exception("Catalog refresh failed")
+        finally:
+            self._refreshing = False
+
+    def get(self) -> CatalogSnapshot:
+        """Получение текущего снимка каталога."""
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot or self.load()
+        elif monotonic() - snapshot.loaded_at > self.ttl:
+            with self._lock:
+                start_refresh = not self._refreshing
+                self._refreshing = True
+            if start_refresh:
+                Thread(target=self.refresh, daemon=True).start()
+        return snapshot
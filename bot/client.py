@@ -0,0 +1,119 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+from requests import HTTPError, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ApiClient:
+    """
+    Клиент для запросов бота к API кулинарной книги.
+
+    Использует одну сессию с пулом соединений (keep-alive), таймауты
+    и ограниченное число повторов с нарастающей задержкой (только при
+    ошибках соединения и ответах 502/503/504 - 500 означает ошибку API,
+    которую повтор не исправит).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: Union[float, Tuple[float, float]] = (3.05, 10),
+        retries: int = 3,
+        backoff_factor: float = 0.3,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, path: str, params: Optional[Dict[str, str]] = None) -> Any:
+        """Функция для GET-запроса к API. Возвращает данные из JSON ответа."""
+
+        response = self.session.get(
+            urljoin(self.base_url, path), params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def get_if_changed(self, path: str, etag: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """
+        Функция для условного GET-запроса к API (If-None-Match).
+
+        Возвращает данные и ETag ответа; если данные не изменились - (None, etag).
+        """
+
+        headers = {"If-None-Match": etag} if etag else None
+        response = self.session.get(
+            urljoin(self.base_url, path), headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.json(), response.headers.get("ETag")
+
+    def get_all(self, path: str, params: Optional[Dict[str, str]] = None) -> List[dict]:
+        """Функция для получения всех страниц списка (постраничный вывод по курсору)."""
+
+        results = list()
+        page = self.get(path, params)
+        results.extend(page.get("results"))
+        while page.get("next"):
+            page = self.get(page.get("next"))
+            results.extend(page.get("results"))
+        return results
+
+    def get_random_recipe(self) -> dict:
+        return self.get("api/random_recipe")
+
+    def get_menu_day(self) -> Optional[dict]:
+        """Меню на день. None - если меню не составить (в каталоге нет рецептов для приема пищи)."""
+
+        try:
+            return self.get("api/menu_day")
+        except HTTPError as error:
+            if error.response is not None and error.response.status_code == 404:
+                return None
+            raise
+
+    def get_recipe(self, recipe_id: int) -> dict:
+        return self.get(f"api/recipes/{recipe_id}")
+
+    def get_categories(self) -> List[dict]:
+        return self.get_all("api/categories")
+
+    def get_ingredients(self) -> Dict[str, List[dict]]:
+        return self.get("api/ingredients")
+
+    def get_ingredients_if_changed(self, version: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """Ингредиенты, если каталог изменился с версии version (ETag), и новая версия."""
+
+        return self.get_if_changed("api/ingredients", version)
+
+    def get_recipes_by_categories(self, categories: Iterable[int], select: bool) -> List[dict]:
+        """Рецепты из выбранных категорий (select - совпадение по всем категориям сразу)."""
+
+        return self.get_all(
+            f"api/recipes/categories/{'select' if select else 'aside'}",
+            {"categories": ",".join(str(category) for category in categories)},
+        )
+
+    def get_recipes_by_ingredients(self, ingredients: Iterable[int], only: bool) -> List[dict]:
+        """Рецепты с выбранными ингредиентами (only - только с выбранными ингредиентами)."""
+
+        return self.get_all(
+            f"api/recipes/ingredients/{'only' if only else 'in'}",
+            {"ingredients": ",".join(str(ingredient) for ingredient in ingredients)},
+        )
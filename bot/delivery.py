@@ -0,0 +1,125 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from typing import List, Optional, Tuple
+
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+
+from photos import PhotoCache
+
+logger = logging.getLogger(__name__)
+
+CAPTION_LIMIT = 1024
+MESSAGE_LIMIT = 4096
+
+
+def get_text_length(text: str) -> int:
+    """Длина текста сообщения без HTML-разметки (так ее считает Telegram)."""
+
+    return len(re.sub(r"<[^>]+>", "", text))
+
+
+def split_caption(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Функция для разделения текста на подпись к фото и остаток.
+
+    Если текст помещается в подпись - остаток None, иначе подпись - первая
+    строка текста, а весь текст отправляется отдельным сообщением.
+    """
+
+    if get_text_length(text) <= CAPTION_LIMIT:
+        return text, None
+    return text.split("\n", 1)[0], text
+
+
+def join_messages(texts: List[str]) -> List[str]:
+    """Функция для объединения текстов в как можно меньшее число сообщений."""
+
+    messages = list()
+    for text in texts:
+        if messages and get_text_length(messages[-1] + text) + 2 <= MESSAGE_LIMIT:
+            messages[-1] += "\n\n" + text
+        else:
+            messages.append(text)
+    return messages
+
+
+def send_album(
+    bot: TeleBot,
+    photo_cache: PhotoCache,
+    chat_id: int,
+    items: List[Tuple[str, str]],
+    workers: int = 4,
+) -> None:
+    """
+    Функция для отправки фото с текстами одним альбомом.
+
+    items - пары (путь к фото, текст в HTML). Тексты, не поместившиеся
+    в подпись, отправляются после альбома одним-двумя сообщениями.
+    Если альбом отправить не удалось, фото с текстами отправляются
+    по одному (send_in_order). Ошибка отправки текста после альбома
+    только записывается в лог: альбом уже у пользователя.
+    """
+
+    album = list()
+    texts = list()
+    for path, text in items:
+        caption, rest = split_caption(text)
+        album.append((path, caption))
+        if rest:
+            texts.append(rest)
+
+    try:
+        photo_cache.send_media_group(bot, chat_id, album, parse_mode="HTML")
+    except (ApiTelegramException, OSError):
+        logger.warning("Media group failed, sending items one by one", exc_info=True)
+        send_in_order(bot, photo_cache, chat_id, items, workers=workers)
+        return
+    for message in join_messages(texts):
+        try:
+            bot.send_message(chat_id, message, parse_mode="HTML")
+        except ApiTelegramException:
+            logger.exception("Failed to send menu text after the album (chat %s)", chat_id)
+
+
+def send_in_order(
+    bot: TeleBot,
+    photo_cache: PhotoCache,
+    chat_id: int,
+    items: List[Tuple[str, str]],
+    workers: int = 4,
+) -> None:
+    """
+    Функция для отправки фото с текстами через пул потоков.
+
+    Подготовка фото (поиск file_id, чтение файла) выполняется параллельно,
+    а сообщения отправляются строго по порядку: Telegram упорядочивает
+    сообщения по времени получения. Фото, которое не удалось прочитать,
+    пропускается - текст отправляется все равно.
+    """
+
+    sent = [Event() for _ in items]
+
+    def send(index: int, path: str, text: str) -> None:
+        try:
+            photo = photo_cache.load(path)
+        except OSError:
+            photo = None
+        if index:
+            sent[index - 1].wait()
+        try:
+            if photo is not None:
+                photo_cache.send_photo(bot, chat_id, path, photo=photo)
+            bot.send_message(chat_id, text, parse_mode="HTML")
+        finally:
+            sent[index].set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(send, index, path, text)
+            for index, (path, text) in enumerate(items)
+        ]
+    for future in futures:
+        future.result()
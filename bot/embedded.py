@@ -0,0 +1,73 @@
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cookbook.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from api import queries  # noqa: E402
+from api.caching import get_catalog_version  # noqa: E402
+from api.letters import ingredient_letters  # noqa: E402
+from api.models import Recipe  # noqa: E402
+from api.serializers import (CategorySerializer, MenuDaySerializer,  # noqa: E402
+                             RecipeFullSerializer, RecipeShortSerializer)
+
+logger = logging.getLogger(__name__)
+
+if "LocMemCache" in settings.CACHES["default"]["BACKEND"]:
+    logger.warning(
+        "Embedded mode with a process-local cache: catalog changes made by the "
+        "API process are not visible to the bot. Set CACHE_BACKEND to a shared "
+        "backend (e.g. django.core.cache.backends.filebased.FileBasedCache)."
+    )
+
+
+class EmbeddedClient:
+    """
+    Клиент для запросов бота напрямую к Django (без HTTP).
+
+    Использует те же запросы и сериализаторы, что и представления API,
+    и возвращает данные в том же виде, что и ApiClient.
+    """
+
+    def get_random_recipe(self) -> dict:
+        recipe = queries.get_random_recipe()
+        if recipe is None:
+            raise Recipe.DoesNotExist("No recipes in the catalog.")
+        return RecipeFullSerializer(recipe).data
+
+    def get_menu_day(self) -> dict:
+        return MenuDaySerializer(queries.get_menu_day()).data
+
+    def get_recipe(self, recipe_id: int) -> dict:
+        return RecipeFullSerializer(queries.get_recipe(recipe_id)).data
+
+    def get_categories(self) -> List[dict]:
+        return CategorySerializer(queries.get_categories(), many=True).data
+
+    def get_ingredients(self) -> Dict[str, List[dict]]:
+        return ingredient_letters.get_all()
+
+    def get_ingredients_if_changed(self, version: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """Ингредиенты, если каталог изменился с версии version, и новая версия."""
+
+        current_version = str(get_catalog_version())
+        if current_version == version:
+            return None, version
+        return self.get_ingredients(), current_version
+
+    def get_recipes_by_categories(self, categories: Iterable[int], select: bool) -> List[dict]:
+        """Рецепты из выбранных категорий (select - совпадение по всем категориям сразу)."""
+
+        recipes = queries.get_recipes_by_categories(categories, select=select)
+        return RecipeShortSerializer(recipes.order_by("id"), many=True).data
+
+    def get_recipes_by_ingredients(self, ingredients: Iterable[int], only: bool) -> List[dict]:
+        """Рецепты с выбранными ингредиентами (only - только с выбранными ингредиентами)."""
+
+        recipes = queries.get_recipes_by_ingredients(ingredients, only=only)
+        return RecipeShortSerializer(recipes.order_by("id"), many=True).data
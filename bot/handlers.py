@@ -1,21 +1,55 @@
-import json
 import os
-import requests
 from typing import Any
 
 from dotenv import load_dotenv
-from telebot import TeleBot
+from telebot import TeleBot, apihelper
 from telebot.types import (BotCommand, CallbackQuery, InlineKeyboardButton,
                            InlineKeyboardMarkup, Message)
 
+import callbacks
+import delivery
 import utils
+from callbacks import CallbackRouter
+from catalog import Catalog
+from client import ApiClient
+from keyboards import get_keyboard_categories, get_keyboard_ingredients
+from photos import PhotoCache
+from state import Selection, get_state_store
 
 load_dotenv()
 
 API_TOKEN = os.getenv("API_TOKEN")
 URL = os.getenv("URL")
-
-bot = TeleBot(API_TOKEN)
+# http - запросы к API по HTTP, embedded - напрямую через Django (тот же PYTHONPATH)
+BOT_BACKEND = os.getenv("BOT_BACKEND", "http")
+PHOTO_CACHE_PATH = os.getenv(
+    "PHOTO_CACHE_PATH", os.path.join(os.path.dirname(__file__), "photo_cache.sqlite3")
+)
+SEND_WORKERS = int(os.getenv("SEND_WORKERS", 4))
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", 300))
+# polling - опрос Telegram одним циклом, webhook - прием обновлений HTTP-сервером (webhook.py)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+UPDATE_WORKERS = int(os.getenv("UPDATE_WORKERS", os.cpu_count() or 4))
+# адрес Bot API (например, локальная заглушка Telegram для проверки): .../bot{0}/{1}
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+# memory - выбор пользователей в памяти процесса, sqlite - в файле STATE_PATH (общий для процессов)
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+STATE_PATH = os.getenv(
+    "STATE_PATH", os.path.join(os.path.dirname(__file__), "state.sqlite3")
+)
+STATE_TTL = float(os.getenv("STATE_TTL", 86400))
+STATE_MAX_USERS = int(os.getenv("STATE_MAX_USERS", 10000))
+
+if TELEGRAM_API_URL:
+    apihelper.API_URL = TELEGRAM_API_URL
+
+# в режиме webhook обновления обрабатывает пул webhook.py (с порядком внутри чата)
+bot = TeleBot(API_TOKEN, threaded=BOT_MODE != "webhook")
 bot.set_my_description("Ищите интересные и необычные рецепты по категориям и ингредиентам.")
 bot.set_my_commands([
     BotCommand("start", "Начни работу с ботом"),
@@ -26,10 +60,15 @@ bot.set_my_commands([
 ])
 
 
-categories = json.loads(requests.get(f"{URL}api/categories").text)
-ingredients = json.loads(requests.get(f"{URL}api/ingredients").text)
-user_categories = dict()
-user_ingredients = dict()
+if BOT_BACKEND == "embedded":
+    from embedded import EmbeddedClient
+    api_client = EmbeddedClient()
+else:
+    api_client = ApiClient(URL)
+photo_cache = PhotoCache(PHOTO_CACHE_PATH)
+
+catalog = Catalog(api_client, ttl=CATALOG_TTL)
+state = get_state_store(STATE_BACKEND, STATE_PATH, ttl=STATE_TTL, max_users=STATE_MAX_USERS)
 
 
 """Обработчики команд:"""
@@ -79,8 +118,11 @@ def search_by_ingredients(message: Message) -> None:
 
 """Обработчики callback_query:"""
 
+router = CallbackRouter()
+bot.register_callback_query_handler(router.dispatch, func=None)
 
-@bot.callback_query_handler(lambda callback: callback.data == "random_recipe")
+
+@router.action(callbacks.RANDOM_RECIPE)
 def callback_random_recipe(callback: CallbackQuery) -> None:
     """Функция для обработки запроса при нажатии кнопки главного меню 'Случайный рецепт'."""
 
@@ -88,7 +130,7 @@ def callback_random_recipe(callback: CallbackQuery) -> None:
     send_random_recipe(callback.message)
 
 
-@bot.callback_query_handler(lambda callback: callback.data == "menu_day")
+@router.action(callbacks.MENU_DAY)
 def callback_menu_day(callback: CallbackQuery) -> None:
     """Функция для обработки запроса при нажатии кнопки главного меню 'Меню на день'."""
 
@@ -96,7 +138,7 @@ def callback_menu_day(callback: CallbackQuery) -> None:
     send_menu_day(callback.message)
 
 
-@bot.callback_query_handler(lambda callback: callback.data == "search_by_category")
+@router.action(callbacks.CATEGORIES)
 def callback_search_by_category(callback: CallbackQuery) -> None:
     """Функция для обработки запроса при нажатии кнопки главного меню 'Поиск по категориям'."""
 
@@ -104,24 +146,17 @@ def callback_search_by_category(callback: CallbackQuery) -> None:
     send_categories(callback.message)
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("category"))
-def callback_selected_categories(callback: CallbackQuery) -> None:
+@router.action(callbacks.CATEGORY)
+def callback_selected_categories(callback: CallbackQuery, category_id: int) -> None:
     """
     Функция для обработки запроса при выборе одной кнопки категории.
 
     Изменяется клавиатура - выбранные категории помечены галочкой (на вид как чекбокс).
     """
 
-    global user_categories
     user_id = callback.message.chat.id
-    user_categories.setdefault(user_id, list())
-    category_id = int(callback.data.split()[-1])
-    if category_id not in user_categories[user_id]:
-        user_categories[user_id].append(int(callback.data.split()[-1]))
-    else:
-        user_categories[user_id].remove(category_id)
-
-    keyboard = get_keyboard_categories(categories, user_id)
+    selection = state.toggle_category(user_id, category_id)
+    keyboard = get_keyboard_categories(catalog.get(), selection)
 
     bot.edit_message_text(
         chat_id=user_id,
@@ -131,24 +166,24 @@ def callback_selected_categories(callback: CallbackQuery) -> None:
     )
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("send_categories"))
-def callback_send_categories_aside_select(callback: CallbackQuery) -> None:
+@router.action(callbacks.CATEGORIES_SEND)
+def callback_send_categories_aside_select(callback: CallbackQuery, mode: int) -> None:
     """Функция для обработки запроса при отправке выбранных категорий."""
 
-    global user_categories
     user_id = callback.message.chat.id
-    url_endswith = "aside" if callback.data.endswith("aside") else "select"
-    response = requests.get(
-        f"{URL}api/recipes/categories/{url_endswith}",
-        params=f"categories={','.join([str(category) for category in user_categories[user_id]])}"
-    )
-    recipes = json.loads(response.text)
+    categories = state.get(user_id).categories
+    if not categories:
+        # выбор устарел (истек или вытеснен из хранилища) - предлагаем выбрать заново
+        bot.answer_callback_query(callback.id, "Выбор устарел, выберите заново")
+        send_categories(callback.message)
+        return
+    recipes = api_client.get_recipes_by_categories(categories, select=mode == callbacks.SELECT)
     keyboard = utils.get_keyboard_recipes(recipes)
     text_message = "Блюда:" if keyboard.keyboard else "Блюда не найдены"
     bot.send_message(user_id, text_message, reply_markup=keyboard)
 
 
-@bot.callback_query_handler(lambda callback: callback.data == "search_by_ingredients")
+@router.action(callbacks.INGREDIENTS)
 def callback_search_by_ingredients(callback: CallbackQuery) -> None:
     """Функция для обработки запроса при нажатии кнопки главного меню 'Поиск по ингредиентам'."""
 
@@ -156,51 +191,34 @@ def callback_search_by_ingredients(callback: CallbackQuery) -> None:
     send_ingredients(callback.message)
 
 
-@bot.callback_query_handler(lambda callback: callback.data.endswith("add"))
+@router.action(callbacks.INGREDIENTS_ADD)
 def callback_search_by_ingredients_add(callback: CallbackQuery) -> None:
     """Функция для обработки запроса при нажатии кнопки 'другие ингредиенты' если нет выбранных."""
 
     send_ingredients(callback.message, add=True)
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("sbi"))
-def callback_selected_startswith_symbol_for_ingredients(callback: CallbackQuery) -> None:
+@router.action(callbacks.LETTER)
+def callback_selected_startswith_symbol_for_ingredients(callback: CallbackQuery, symbol: int) -> None:
     """Функция для обработки запроса при выборе начала названия ингредиента."""
 
-    callback_data = callback.data.split()
-    user_id = callback.message.chat.id
+    if not 0 <= symbol < len(utils.ALPHABET):
+        callback_outdated(callback)
+        return
+    selection = state.get(callback.message.chat.id)
+    send_letter_ingredients(callback.message, utils.ALPHABET[symbol], selection)
 
-    global user_ingredients
-    user_ingredients.setdefault(user_id, dict())
-    if len(callback_data) > 2:
-        ingredient_id = int(callback_data[-1])
-        if ingredient_id not in user_ingredients[user_id].keys():
-            user_ingredients[user_id][ingredient_id] = " ".join(callback_data[1:-1])
-        else:
-            user_ingredients[user_id].pop(ingredient_id)
-
-    startswith_ingredient = callback_data[1][0]
-    global ingredients
-    symbol_ingredients = ingredients.get(startswith_ingredient)
-    keyboard = get_keyboard_ingredients(symbol_ingredients, user_id)
-    select_ingredients = ", ".join(user_ingredients[user_id].values())
-    text_message = f"Выбранные ингредиенты: {select_ingredients}"
-
-    if text_message.startswith("Выбранные ингредиенты:"):
-        keyboard.add(InlineKeyboardButton(
-            text="<<< Добавить другие ингредиенты",
-            callback_data="search_by_ingredients_add"
-        ))
 
-    bot.edit_message_text(
-        chat_id=user_id,
-        message_id=callback.message.message_id,
-        text=text_message,
-        reply_markup=keyboard
-    )
+@router.action(callbacks.INGREDIENT)
+def callback_selected_ingredient(callback: CallbackQuery, ingredient_id: int) -> None:
+    """Функция для обработки запроса при выборе одной кнопки ингредиента."""
+
+    selection = state.toggle_ingredient(callback.message.chat.id, ingredient_id)
+    symbol = catalog.get().ingredient_letters.get(ingredient_id)
+    send_letter_ingredients(callback.message, symbol, selection)
 
 
-@bot.callback_query_handler(lambda callback: callback.data == "send_ingredients")
+@router.action(callbacks.INGREDIENTS_FIND)
 def callback_send_ingredients(callback: CallbackQuery) -> None:
     """
     Функция для обработки запроса при нажатии кнопки 'Найти рецепт'.
@@ -210,85 +228,92 @@ def callback_send_ingredients(callback: CallbackQuery) -> None:
     """
 
     user_id = callback.message.chat.id
-    global user_ingredients
-    bot.send_message(
-        user_id, f"Выбранные ингредиенты: {', '.join(user_ingredients[user_id].values())}"
-    )
+    ingredients = state.get(user_id).ingredients
+    if not ingredients:
+        bot.answer_callback_query(callback.id, "Выбор устарел, выберите заново")
+        send_ingredients(callback.message)
+        return
+    select_ingredients = ", ".join(catalog.get().get_ingredient_names(ingredients))
+    bot.send_message(user_id, f"Выбранные ингредиенты: {select_ingredients}")
     keyboard = InlineKeyboardMarkup()
     button_aside = InlineKeyboardButton(
         text="с содержанием ингредиентов",
-        callback_data="send_ingredients_aside"
+        callback_data=callbacks.encode(callbacks.INGREDIENTS_SEND, callbacks.ASIDE)
     )
     keyboard.add(button_aside)
     button_select = InlineKeyboardButton(
         text="с ограничением по ингредиентам",
-        callback_data="send_ingredients_select"
+        callback_data=callbacks.encode(callbacks.INGREDIENTS_SEND, callbacks.SELECT)
     )
     keyboard.add(button_select)
     bot.send_message(user_id, "Поиск рецептов...", reply_markup=keyboard)
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("send_ingredients"))
-def callback_send_ingredients_aside_select(callback: CallbackQuery) -> None:
+@router.action(callbacks.INGREDIENTS_SEND)
+def callback_send_ingredients_aside_select(callback: CallbackQuery, mode: int) -> None:
     """Функция для обработки запроса при отправке выбранных ингредиентов."""
 
-    global user_ingredients
     user_id = callback.message.chat.id
-    ingredients = ",".join([str(ingredient) for ingredient in user_ingredients[user_id].keys()])
-    url_endswith = "in" if callback.data.endswith("aside") else "only"
-    response = requests.get(
-        f"{URL}api/recipes/ingredients/{url_endswith}", params=f"ingredients={ingredients}"
-    )
-    recipes = json.loads(response.text)
+    ingredients = state.get(user_id).ingredients
+    if not ingredients:
+        bot.answer_callback_query(callback.id, "Выбор устарел, выберите заново")
+        send_ingredients(callback.message)
+        return
+    recipes = api_client.get_recipes_by_ingredients(ingredients, only=mode == callbacks.SELECT)
     keyboard = utils.get_keyboard_recipes(recipes)
     text_message = "Блюда:" if keyboard.keyboard else "Блюда не найдены"
     bot.send_message(user_id, text_message, reply_markup=keyboard)
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("clear"))
-def callback_clear(callback: CallbackQuery) -> None:
-    """Функция для обработки при запросе по очистке выбора."""
+@router.action(callbacks.CATEGORIES_CLEAR)
+def callback_clear_categories(callback: CallbackQuery) -> None:
+    """Функция для обработки при запросе по очистке выбора категорий."""
 
     user_id = callback.message.chat.id
-    if callback.data.endswith("categories"):
-        global user_categories
-        user_categories[user_id].clear()
-        keyboard = get_keyboard_categories(categories, user_id)
-        bot.edit_message_text(
-            chat_id=user_id,
-            message_id=callback.message.message_id,
-            text="Выберите категории:",
-            reply_markup=keyboard
-        )
-    else:
-        global user_ingredients
-        user_ingredients[user_id].clear()
-        keyboard = utils.get_keyboard_startswith_ingredients()
-        bot.edit_message_text(
-            chat_id=user_id,
-            message_id=callback.message.message_id,
-            text="Выберите ингредиенты:",
-            reply_markup=keyboard
-        )
+    selection = state.clear_categories(user_id)
+    keyboard = get_keyboard_categories(catalog.get(), selection)
+    bot.edit_message_text(
+        chat_id=user_id,
+        message_id=callback.message.message_id,
+        text="Выберите категории:",
+        reply_markup=keyboard
+    )
+
+
+@router.action(callbacks.INGREDIENTS_CLEAR)
+def callback_clear_ingredients(callback: CallbackQuery) -> None:
+    """Функция для обработки при запросе по очистке выбора ингредиентов."""
+
+    user_id = callback.message.chat.id
+    state.clear_ingredients(user_id)
+    keyboard = utils.get_keyboard_startswith_ingredients()
+    bot.edit_message_text(
+        chat_id=user_id,
+        message_id=callback.message.message_id,
+        text="Выберите ингредиенты:",
+        reply_markup=keyboard
+    )
 
 
-@bot.callback_query_handler(lambda callback: callback.data.startswith("recipe"))
-def callback_recipe(callback: CallbackQuery) -> None:
+@router.action(callbacks.RECIPE)
+def callback_recipe(callback: CallbackQuery, recipe_id: int) -> None:
     """Функция для обработки при запросе полного рецепта."""
 
     user_id = callback.message.chat.id
-    response = requests.get(f"{URL}api/recipes/{callback.data.split()[-1]}")
-    recipes_data = json.loads(response.text)
+    recipes_data = api_client.get_recipe(recipe_id)
     text = utils.get_recipe_message(recipes_data)
-    with open(recipes_data.get("image"), "rb") as photo:
-        bot.send_photo(callback.message.chat.id, photo=photo)
+    photo_cache.send_photo(bot, callback.message.chat.id, recipes_data.get("image"))
     bot.send_message(user_id, text, parse_mode="HTML")
+    state.clear(user_id)
+
+
+@router.fallback
+def callback_outdated(callback: CallbackQuery) -> None:
+    """Функция для обработки кнопок неизвестного (устаревшего) формата."""
 
-    global user_categories, user_ingredients
-    user_categories.setdefault(user_id, list())
-    user_categories[user_id].clear()
-    user_ingredients.setdefault(user_id, dict())
-    user_ingredients[user_id].clear()
+    bot.answer_callback_query(callback.id, "Кнопка устарела")
+    keyboard = utils.get_main_menu()
+    bot.send_message(callback.message.chat.id, "Что будем искать?", reply_markup=keyboard)
 
 
 @bot.message_handler()
@@ -305,38 +330,35 @@ def other_message(message: Message) -> None:
 def send_random_recipe(msg: Any) -> None:
     """Функция для отправки случайного рецепта."""
 
-    response = requests.get(f"{URL}api/random_recipe")
-    random_recipe = json.loads(response.text)
+    random_recipe = api_client.get_random_recipe()
     text = utils.get_recipe_message(random_recipe)
-    with open(random_recipe.get("image"), "rb") as photo:
-        bot.send_photo(msg.chat.id, photo=photo)
+    photo_cache.send_photo(bot, msg.chat.id, random_recipe.get("image"))
     bot.send_message(msg.chat.id, text, parse_mode="HTML")
 
 
 def send_menu_day(msg: Any) -> None:
     """Функция для отправки меню на день."""
 
-    response = requests.get(f"{URL}api/menu_day")
-    menu = json.loads(response.text)
-
-    for key, value in {
-        "breakfast": "ЗАВТРАК", "lunch": "ОБЕД",
-        "snack": "ПЕРЕКУС", "dinner": "УЖИН",
-    }.items():
-        with open(menu.get(key).get("image"), "rb") as photo:
-            bot.send_photo(msg.chat.id, photo=photo)
-        bot.send_message(
-            msg.chat.id,
-            f"<b>{value}:</b> " + utils.get_recipe_message(menu.get(key)),
-            parse_mode="HTML"
-        )
+    menu = api_client.get_menu_day()
+    if menu is None:
+        bot.send_message(msg.chat.id, "Не удалось составить меню: в каталоге пока мало рецептов.")
+        return
+
+    items = [
+        (menu.get(key).get("image"), f"<b>{value}:</b> " + utils.get_recipe_message(menu.get(key)))
+        for key, value in {
+            "breakfast": "ЗАВТРАК", "lunch": "ОБЕД",
+            "snack": "ПЕРЕКУС", "dinner": "УЖИН",
+        }.items()
+    ]
+    delivery.send_album(bot, photo_cache, msg.chat.id, items, workers=SEND_WORKERS)
 
 
 def send_categories(msg: Any) -> None:
     """Функция для отправки категорий."""
 
     user_id = msg.chat.id
-    keyboard = get_keyboard_categories(categories, user_id)
+    keyboard = get_keyboard_categories(catalog.get(), state.get(user_id))
     bot.send_message(user_id, "Выберите категории:", reply_markup=keyboard)
 
 
@@ -345,20 +367,19 @@ def send_ingredients(msg: Any, add: bool = False) -> None:
 
     keyboard = utils.get_keyboard_startswith_ingredients()
 
-    global user_ingredients
     user_id = msg.chat.id
-    user_ingredients.setdefault(user_id, dict())
+    selection = state.get(user_id)
 
-    if user_ingredients[user_id] or add:
-        select_ingredients = ", ".join(user_ingredients[user_id].values())
+    if selection.ingredients or add:
+        select_ingredients = ", ".join(catalog.get().get_ingredient_names(selection.ingredients))
         text_message = f"Выбранные ингредиенты: {select_ingredients}"
-        if user_ingredients[user_id]:
+        if selection.ingredients:
             keyboard.add(InlineKeyboardButton(
                 text="Очистить ингредиенты",
-                callback_data="clear_ingredients"
+                callback_data=callbacks.encode(callbacks.INGREDIENTS_CLEAR)
             ))
             keyboard.add(InlineKeyboardButton(
-                text="Найти рецепты", callback_data="send_ingredients"
+                text="Найти рецепты", callback_data=callbacks.encode(callbacks.INGREDIENTS_FIND)
             ))
         bot.edit_message_text(
             chat_id=user_id,
@@ -370,77 +391,36 @@ def send_ingredients(msg: Any, add: bool = False) -> None:
         bot.send_message(msg.chat.id, "Выберите ингредиенты:", reply_markup=keyboard)
 
 
-"""Функции для получения inline-клавиатур:"""
-
-
-def get_keyboard_categories(categories_data: json, user_id: int) -> InlineKeyboardMarkup:
-    """Функция для получения inline-меню с категориями блюд."""
-
-    global user_categories
-    user_categories.setdefault(user_id, list())
-    buttons = list()
-    for category in categories_data:
-        category_id = category.get('id')
-        if category_id in user_categories[user_id]:
-            text = "✅ " + category.get("name")
-        else:
-            text = "🟩 " + category.get("name")
-        buttons.append(InlineKeyboardButton(text=text, callback_data=f"category {category_id}"))
-    keyboard = utils.get_inline_keyboard_row(buttons=buttons)
-
-    if user_categories[user_id]:
-        button_send = InlineKeyboardButton(
-            text="Очистить выбор",
-            callback_data="clear_categories"
-        )
-        keyboard.row(button_send)
+def send_letter_ingredients(msg: Any, symbol: str, selection: Selection) -> None:
+    """Функция для отправки ингредиентов на букву symbol (с отметкой выбранных)."""
 
-    button_send = InlineKeyboardButton(
-        text="Найти рецепты из каждой категории",
-        callback_data="send_categories_aside"
-    )
-    keyboard.row(button_send)
-    button_send = InlineKeyboardButton(
-        text="Найти рецепты с полным совпадением",
-        callback_data="send_categories_select"
+    snapshot = catalog.get()
+    keyboard = get_keyboard_ingredients(snapshot, symbol, selection)
+    select_ingredients = ", ".join(snapshot.get_ingredient_names(selection.ingredients))
+    keyboard.add(InlineKeyboardButton(
+        text="<<< Добавить другие ингредиенты",
+        callback_data=callbacks.encode(callbacks.INGREDIENTS_ADD)
+    ))
+    bot.edit_message_text(
+        chat_id=msg.chat.id,
+        message_id=msg.message_id,
+        text=f"Выбранные ингредиенты: {select_ingredients}",
+        reply_markup=keyboard
     )
-    keyboard.row(button_send)
-    return keyboard
-
-
-def get_keyboard_ingredients(ingredients_data: json, user_id: int) -> InlineKeyboardMarkup:
-    """Функция для получения inline-меню с ингредиентами."""
-
-    global user_ingredients
-    user_ingredients.setdefault(user_id, dict())
-    buttons = list()
-    for ingredient in ingredients_data:
-        ingredient_id = ingredient.get('id')
-        if ingredient_id in user_ingredients[user_id].keys():
-            text = "✅ " + ingredient.get("name")
-        else:
-            text = "🟩 " + ingredient.get("name")
-        buttons.append(InlineKeyboardButton(
-            text=text, callback_data=f"sbi {text[2:]} {ingredient_id}")
-        )
-    keyboard = utils.get_inline_keyboard_row(buttons=buttons, row_count=2)
-    if user_ingredients[user_id]:
-        keyboard.add(InlineKeyboardButton(
-            text="Найти рецепты", callback_data="send_ingredients"
-        ))
-    return keyboard
 
 
 def clear_all(user_id: int) -> None:
     """Функция для очищения данных пользователя о категориях и ингредиентах."""
 
-    global user_categories
-    if user_categories.get(user_id):
-        user_categories[user_id].clear()
-    global user_ingredients
-    if user_ingredients.get(user_id):
-        user_ingredients[user_id].clear()
+    state.clear(user_id)
 
 
 if __name__ == "__main__":
-    bot.infinity_polling()
+    if BOT_MODE == "webhook":
+        from webhook import run_webhook
+        run_webhook(
+            bot, WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET, workers=UPDATE_WORKERS,
+        )
+    else:
+        bot.infinity_polling()
@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+import callbacks
+from catalog import CatalogSnapshot
+from state import Selection
+
+Rows = Tuple[Tuple[InlineKeyboardButton, ...], ...]
+Templates = Tuple[Dict[int, int], List[Tuple[InlineKeyboardButton, InlineKeyboardButton]]]
+
+
+class Button(InlineKeyboardButton):
+    """
+    Кнопка для кэшированных клавиатур.
+
+    Не изменяется после создания, поэтому ее JSON-представление
+    формируется один раз.
+    """
+
+    _dict: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        if self._dict is None:
+            self._dict = super().to_dict()
+        return self._dict
+
+
+def get_rows(buttons: Sequence[InlineKeyboardButton], row_count: int = 3) -> Rows:
+    """Функция для разбиения кнопок на ряды."""
+
+    return tuple(
+        tuple(buttons[i:i + row_count]) for i in range(0, len(buttons), row_count)
+    )
+
+
+def get_keyboard(rows: Rows) -> InlineKeyboardMarkup:
+    """
+    Функция для получения новой клавиатуры из готовых рядов кнопок.
+
+    Клавиатуру можно дополнять - кэшированные ряды при этом не меняются.
+    """
+
+    return InlineKeyboardMarkup([list(row) for row in rows])
+
+
+def get_mask(index: Dict[int, int], ids: Iterable[int]) -> int:
+    """Функция для получения битовой маски выбранных id (номера битов - из index)."""
+
+    mask = 0
+    for item_id in ids:
+        if item_id in index:
+            mask |= 1 << index[item_id]
+    return mask
+
+
+class KeyboardCache:
+    """
+    Кэш inline-клавиатур с чекбоксами.
+
+    Для каждого списка (категорий или ингредиентов на букву) один раз
+    создаются пары кнопок "не выбрано"/"выбрано", а готовые ряды кнопок
+    хранятся по ключу (список, битовая маска выбора). При смене версии
+    каталога кэш очищается. Размер кэша рядов ограничен maxsize (LRU).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._version: Optional[str] = None
+        self._templates: Dict[Hashable, Templates] = dict()
+        self._rows: "OrderedDict[Hashable, Rows]" = OrderedDict()
+
+    def set_version(self, version: Optional[str]) -> None:
+        """Сброс кэша, если версия каталога изменилась."""
+
+        if version != self._version:
+            with self._lock:
+                self._templates.clear()
+                self._rows.clear()
+                self._version = version
+
+    def get_templates(
+        self,
+        key: Hashable,
+        items: Iterable[dict],
+        get_button: Callable[[dict, bool], InlineKeyboardButton],
+    ) -> Templates:
+        """Номера битов id и пары кнопок (не выбрано, выбрано) для списка key."""
+
+        templates = self._templates.get(key)
+        if templates is None:
+            index = dict()
+            buttons = list()
+            for item in items:
+                index[item.get("id")] = len(buttons)
+                buttons.append((get_button(item, False), get_button(item, True)))
+            templates = self._templates[key] = (index, buttons)
+        return templates
+
+    def get_rows(self, key: Hashable, build: Callable[[], Rows]) -> Rows:
+        """Ряды кнопок по ключу (build - построение при отсутствии в кэше)."""
+
+        with self._lock:
+            rows = self._rows.get(key)
+            if rows is not None:
+                self._rows.move_to_end(key)
+                return rows
+        rows = build()
+        with self._lock:
+            self._rows[key] = rows
+            while len(self._rows) > self.maxsize:
+                self._rows.popitem(last=False)
+        return rows
+
+    def get_checkbox_rows(
+        self,
+        key: Hashable,
+        items: Iterable[dict],
+        get_button: Callable[[dict, bool], InlineKeyboardButton],
+        selected: Iterable[int],
+        row_count: int,
+    ) -> Rows:
+        """Ряды кнопок-чекбоксов списка key, отмеченных по выбранным id."""
+
+        index, buttons = self.get_templates(key, items, get_button)
+        mask = get_mask(index, selected)
+        return self.get_rows(
+            (key, mask),
+            lambda: get_rows(
+                [pair[mask >> bit & 1] for bit, pair in enumerate(buttons)], row_count
+            ),
+        )
+
+
+keyboard_cache = KeyboardCache()
+
+CLEAR_CATEGORIES = Button(
+    text="Очистить выбор", callback_data=callbacks.encode(callbacks.CATEGORIES_CLEAR)
+)
+SEND_CATEGORIES_ASIDE = Button(
+    text="Найти рецепты из каждой категории",
+    callback_data=callbacks.encode(callbacks.CATEGORIES_SEND, callbacks.ASIDE),
+)
+SEND_CATEGORIES_SELECT = Button(
+    text="Найти рецепты с полным совпадением",
+    callback_data=callbacks.encode(callbacks.CATEGORIES_SEND, callbacks.SELECT),
+)
+SEND_INGREDIENTS = Button(
+    text="Найти рецепты", callback_data=callbacks.encode(callbacks.INGREDIENTS_FIND)
+)
+
+
+def get_category_button(category: dict, checked: bool) -> InlineKeyboardButton:
+    text = ("✅ " if checked else "🟩 ") + category.get("name")
+    return Button(text=text, callback_data=callbacks.encode(callbacks.CATEGORY, category.get("id")))
+
+
+def get_ingredient_button(ingredient: dict, checked: bool) -> InlineKeyboardButton:
+    text = ("✅ " if checked else "🟩 ") + ingredient.get("name")
+    return Button(
+        text=text, callback_data=callbacks.encode(callbacks.INGREDIENT, ingredient.get("id"))
+    )
+
+
+def get_keyboard_categories(snapshot: CatalogSnapshot, selection: Selection) -> InlineKeyboardMarkup:
+    """Функция для получения inline-меню с категориями блюд."""
+
+    keyboard_cache.set_version(snapshot.version)
+    rows = keyboard_cache.get_checkbox_rows(
+        "categories", snapshot.categories, get_category_button, selection.categories, 3
+    )
+    keyboard = get_keyboard(rows)
+    if selection.categories:
+        keyboard.row(CLEAR_CATEGORIES)
+    keyboard.row(SEND_CATEGORIES_ASIDE)
+    keyboard.row(SEND_CATEGORIES_SELECT)
+    return keyboard
+
+
+def get_keyboard_ingredients(
+    snapshot: CatalogSnapshot, symbol: str, selection: Selection
+) -> InlineKeyboardMarkup:
+    """Функция для получения inline-меню с ингредиентами на букву symbol."""
+
+    keyboard_cache.set_version(snapshot.version)
+    rows = keyboard_cache.get_checkbox_rows(
+        ("ingredients", symbol),
+        snapshot.ingredients.get(symbol) or list(),
+        get_ingredient_button,
+        selection.ingredients,
+        2,
+    )
+    keyboard = get_keyboard(rows)
+    if selection.ingredients:
+        keyboard.add(SEND_INGREDIENTS)
+    return keyboard
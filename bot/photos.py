@@ -0,0 +1,126 @@
+import os
+import sqlite3
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+from telebot.types import InputMediaPhoto, Message
+
+
+class PhotoCache:
+    """
+    Хранилище file_id фотографий, уже загруженных в Telegram.
+
+    Ключ - путь к файлу, время его изменения и размер: если файл изменен,
+    фотография будет загружена заново. Данные хранятся в SQLite и
+    переживают перезапуск бота.
+    """
+
+    def __init__(self, path: str):
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS photo ("
+                "key TEXT PRIMARY KEY, file_id TEXT NOT NULL)"
+            )
+            self._file_ids: Dict[str, str] = dict(
+                self._connection.execute("SELECT key, file_id FROM photo")
+            )
+
+    @staticmethod
+    def get_key(path: str) -> str:
+        """Ключ фотографии: путь, время изменения и размер файла."""
+
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def get_file_id(self, path: str) -> Optional[str]:
+        """Получение file_id фотографии. None - если фотография еще не загружалась."""
+
+        return self._file_ids.get(self.get_key(path))
+
+    def save_file_id(self, path: str, file_id: str) -> None:
+        """Сохранение file_id загруженной фотографии."""
+
+        key = self.get_key(path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO photo (key, file_id) VALUES (?, ?)", (key, file_id)
+            )
+            self._file_ids[key] = file_id
+
+    def delete_file_id(self, path: str) -> None:
+        """Удаление file_id (н-р, если Telegram его больше не принимает)."""
+
+        key = self.get_key(path)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM photo WHERE key = ?", (key,))
+            self._file_ids.pop(key, None)
+
+    def load(self, path: str) -> Union[str, bytes]:
+        """file_id фотографии, если она уже загружалась, иначе содержимое файла."""
+
+        file_id = self.get_file_id(path)
+        if file_id:
+            return file_id
+        with open(path, "rb") as photo:
+            return photo.read()
+
+    def send_photo(
+        self, bot: TeleBot, chat_id: int, path: str, photo: Union[str, bytes, None] = None, **kwargs
+    ) -> Message:
+        """
+        Функция для отправки фотографии.
+
+        Если фотография уже загружалась - отправляется ее file_id,
+        иначе файл загружается и file_id запоминается.
+        Можно передать заранее подготовленные данные photo (см. load).
+        """
+
+        if photo is None:
+            photo = self.load(path)
+        if isinstance(photo, str):
+            try:
+                return bot.send_photo(chat_id, photo=photo, **kwargs)
+            except ApiTelegramException as error:
+                # 400 - Telegram не принял file_id, загружаем файл заново
+                if error.error_code != 400:
+                    raise
+                self.delete_file_id(path)
+                photo = self.load(path)
+
+        message = bot.send_photo(chat_id, photo=photo, **kwargs)
+        self.save_file_id(path, message.photo[-1].file_id)
+        return message
+
+    def send_media_group(
+        self, bot: TeleBot, chat_id: int, items: List[Tuple[str, str]], **kwargs
+    ) -> List[Message]:
+        """
+        Функция для отправки фотографий одним альбомом.
+
+        items - пары (путь к файлу, подпись); kwargs - параметры подписи (parse_mode).
+        """
+
+        photos = [self.load(path) for path, _ in items]
+        try:
+            messages = bot.send_media_group(
+                chat_id,
+                [
+                    InputMediaPhoto(photo, caption=caption, **kwargs)
+                    for photo, (_, caption) in zip(photos, items)
+                ],
+            )
+        except ApiTelegramException as error:
+            if error.error_code != 400 or not any(isinstance(photo, str) for photo in photos):
+                raise
+            # Telegram не принял один из file_id - загружаем все файлы заново
+            for path, _ in items:
+                self.delete_file_id(path)
+            return self.send_media_group(bot, chat_id, items, **kwargs)
+
+        for (path, _), message in zip(items, messages):
+            self.save_file_id(path, message.photo[-1].file_id)
+        return messages
@@ -0,0 +1,249 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from threading import Lock
+from time import monotonic, time
+from typing import Callable, FrozenSet, Iterator, Optional, Tuple
+
+
+def toggle(ids: FrozenSet[int], item_id: int) -> FrozenSet[int]:
+    """Функция для добавления id в набор (или удаления, если он уже выбран)."""
+
+    return ids - {item_id} if item_id in ids else ids | {item_id}
+
+
+@dataclass(frozen=True)
+class Selection:
+    """
+    Выбор пользователя: id категорий и id ингредиентов.
+
+    Названия не хранятся - они берутся из каталога бота.
+    """
+
+    categories: FrozenSet[int] = frozenset()
+    ingredients: FrozenSet[int] = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.categories or self.ingredients)
+
+    def toggle_category(self, category_id: int) -> "Selection":
+        return replace(self, categories=toggle(self.categories, category_id))
+
+    def toggle_ingredient(self, ingredient_id: int) -> "Selection":
+        return replace(self, ingredients=toggle(self.ingredients, ingredient_id))
+
+    def dumps(self) -> str:
+        """Компактная строка для хранения: '1,5,7;12,40'."""
+
+        return ";".join(
+            ",".join(str(item_id) for item_id in sorted(ids))
+            for ids in (self.categories, self.ingredients)
+        )
+
+    @classmethod
+    def loads(cls, data: str) -> "Selection":
+        """Выбор из строки, полученной dumps()."""
+
+        categories, _, ingredients = data.partition(";")
+        return cls(
+            frozenset(int(item_id) for item_id in categories.split(",") if item_id),
+            frozenset(int(item_id) for item_id in ingredients.split(",") if item_id),
+        )
+
+
+class StateStore(ABC):
+    """
+    Хранилище выбора пользователей бота.
+
+    Пустой выбор не хранится. Реализации должны ограничивать объем
+    хранимых данных (время жизни записи и/или число пользователей).
+    """
+
+    @abstractmethod
+    def get(self, user_id: int) -> Selection:
+        """Выбор пользователя (пустой, если записи нет или она устарела)."""
+
+    @abstractmethod
+    def set(self, user_id: int, selection: Selection) -> None:
+        """Сохранение выбора пользователя (пустой выбор удаляет запись)."""
+
+    @abstractmethod
+    def update(self, user_id: int, change: Callable[[Selection], Selection]) -> Selection:
+        """
+        Изменение выбора: change получает текущий выбор и возвращает новый.
+
+        Реализации выполняют чтение и запись атомарно, чтобы одновременные
+        изменения одного пользователя не терялись.
+        """
+
+    def clear(self, user_id: int) -> None:
+        self.set(user_id, Selection())
+
+    def clear_categories(self, user_id: int) -> Selection:
+        return self.update(user_id, lambda selection: replace(selection, categories=frozenset()))
+
+    def clear_ingredients(self, user_id: int) -> Selection:
+        return self.update(user_id, lambda selection: replace(selection, ingredients=frozenset()))
+
+    def toggle_category(self, user_id: int, category_id: int) -> Selection:
+        return self.update(user_id, lambda selection: selection.toggle_category(category_id))
+
+    def toggle_ingredient(self, user_id: int, ingredient_id: int) -> Selection:
+        return self.update(user_id, lambda selection: selection.toggle_ingredient(ingredient_id))
+
+
+class MemoryStateStore(StateStore):
+    """
+    Хранилище выбора в памяти процесса.
+
+    Записи старше ttl секунд считаются пустыми; при превышении max_users
+    вытесняются записи, к которым дольше всего не обращались (LRU).
+    """
+
+    def __init__(self, ttl: float = 86400, max_users: int = 10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._lock = Lock()
+        self._data: "OrderedDict[int, Tuple[Selection, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, user_id: int) -> Selection:
+        with self._lock:
+            return self._get(user_id)
+
+    def set(self, user_id: int, selection: Selection) -> None:
+        with self._lock:
+            self._set(user_id, selection)
+
+    def update(self, user_id: int, change: Callable[[Selection], Selection]) -> Selection:
+        with self._lock:
+            selection = change(self._get(user_id))
+            self._set(user_id, selection)
+            return selection
+
+    def _get(self, user_id: int) -> Selection:
+        item = self._data.get(user_id)
+        if item is None:
+            return Selection()
+        selection, updated_at = item
+        if monotonic() - updated_at > self.ttl:
+            del self._data[user_id]
+            return Selection()
+        self._data.move_to_end(user_id)
+        return selection
+
+    def _set(self, user_id: int, selection: Selection) -> None:
+        if not selection:
+            self._data.pop(user_id, None)
+            return
+        self._data[user_id] = (selection, monotonic())
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.max_users:
+            self._data.popitem(last=False)
+
+
+class SqliteStateStore(StateStore):
+    """
+    Хранилище выбора в SQLite.
+
+    Переживает перезапуск бота и может использоваться несколькими
+    процессами бота одновременно: изменения выполняются в транзакции
+    BEGIN IMMEDIATE. Записи старше ttl секунд и записи сверх max_users
+    (давно не изменявшиеся) удаляются при записи, не чаще раза в
+    cleanup_interval секунд.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 86400,
+        max_users: int = 10000,
+        cleanup_interval: float = 600,
+    ):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.cleanup_interval = cleanup_interval
+        self._cleaned_at = 0.0
+        self._lock = Lock()
+        # транзакции управляются явно (_transaction)
+        self._connection = sqlite3.connect(
+            path, timeout=10, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS selection ("
+                "user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM selection").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция с блокировкой записи с начала (другие процессы ждут ее завершения)."""
+
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def get(self, user_id: int) -> Selection:
+        with self._lock:
+            return self._get(self._connection, user_id)
+
+    def set(self, user_id: int, selection: Selection) -> None:
+        with self._transaction() as connection:
+            self._set(connection, user_id, selection)
+
+    def update(self, user_id: int, change: Callable[[Selection], Selection]) -> Selection:
+        with self._transaction() as connection:
+            selection = change(self._get(connection, user_id))
+            self._set(connection, user_id, selection)
+        return selection
+
+    def _get(self, connection: sqlite3.Connection, user_id: int) -> Selection:
+        row = connection.execute(
+            "SELECT data FROM selection WHERE user_id = ? AND updated_at > ?",
+            (user_id, time() - self.ttl),
+        ).fetchone()
+        return Selection.loads(row[0]) if row else Selection()
+
+    def _set(self, connection: sqlite3.Connection, user_id: int, selection: Selection) -> None:
+        now = time()
+        if selection:
+            connection.execute(
+                "INSERT OR REPLACE INTO selection (user_id, data, updated_at) VALUES (?, ?, ?)",
+                (user_id, selection.dumps(), now),
+            )
+        else:
+            connection.execute("DELETE FROM selection WHERE user_id = ?", (user_id,))
+        if now - self._cleaned_at > self.cleanup_interval:
+            connection.execute("DELETE FROM selection WHERE updated_at <= ?", (now - self.ttl,))
+            connection.execute(
+                "DELETE FROM selection WHERE user_id IN ("
+                "SELECT user_id FROM selection ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_users,),
+            )
+            self._cleaned_at = now
+
+
+def get_state_store(
+    backend: str = "memory", path: Optional[str] = None, ttl: float = 86400, max_users: int = 10000
+) -> StateStore:
+    """Функция для создания хранилища выбора пользователей (memory или sqlite)."""
+
+    if backend == "sqlite":
+        return SqliteStateStore(path, ttl=ttl, max_users=max_users)
+    if backend == "memory":
+        return MemoryStateStore(ttl=ttl, max_users=max_users)
+    raise ValueError(f"Unknown state backend: {backend}")
@@ -0,0 +1,692 @@
+import importlib
+import json
+import os
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from tempfile import TemporaryDirectory
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlsplit
+from unittest import TestCase, mock
+
+from requests import HTTPError
+from telebot.apihelper import ApiTelegramException
+
+import callbacks
+import delivery
+from callbacks import CallbackRouter, decode, encode
+from catalog import Catalog
+from client import ApiClient
+from photos import PhotoCache
+from state import MemoryStateStore, Selection, SqliteStateStore
+from webhook import MAX_BODY_SIZE, SECRET_HEADER, ChatDispatcher, WebhookServer
+
+
+def get_update(update_id: int, chat_id: int) -> dict:
+    """Функция для создания обновления Telegram с сообщением из чата chat_id."""
+
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "test"},
+            "text": str(update_id),
+        },
+    }
+
+
+class FakeBot:
+    """Бот, который только запоминает обработанные обновления по чатам."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.lock = Lock()
+        self.chats = dict()
+        self.processed = Event()
+        self.expected = 0
+
+    def process_new_updates(self, updates: list) -> None:
+        for update in updates:
+            # задержка больше у ранних обновлений - без очереди чата порядок бы нарушился
+            sleep(self.delay / (update.update_id % 10 + 1))
+            with self.lock:
+                self.chats.setdefault(update.message.chat.id, []).append(update.update_id)
+                if sum(map(len, self.chats.values())) == self.expected:
+                    self.processed.set()
+
+
+def get_api_error(error_code: int) -> ApiTelegramException:
+    """Функция для создания ошибки Bot API с кодом error_code."""
+
+    return ApiTelegramException("test", None, {"error_code": error_code, "description": "error"})
+
+
+class FakeTelegram:
+    """
+    Бот, который запоминает отправленные сообщения вместо отправки в Telegram.
+
+    errors - ошибки, которые вызовы метода бросают по очереди (метод: список ошибок),
+    delays - задержка отправки фото (данные фото: секунды).
+    Загруженному фото выдается новый file_id, отправленный file_id возвращается как есть.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.sent = list()
+        self.errors = dict()
+        self.delays = dict()
+        self.uploads = 0
+
+    def call(self, method: str, data) -> None:
+        with self.lock:
+            errors = self.errors.get(method)
+            if errors:
+                raise errors.pop(0)
+            self.sent.append((method, data))
+
+    def get_file_id(self, photo) -> str:
+        if isinstance(photo, str):
+            return photo
+        with self.lock:
+            self.uploads += 1
+            return f"file{self.uploads}"
+
+    def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        self.call("send_message", text)
+
+    def send_photo(self, chat_id: int, photo, **kwargs) -> SimpleNamespace:
+        sleep(self.delays.get(photo, 0))
+        self.call("send_photo", photo)
+        return SimpleNamespace(photo=[SimpleNamespace(file_id=self.get_file_id(photo))])
+
+    def send_media_group(self, chat_id: int, media: list) -> list:
+        self.call("send_media_group", [item.media for item in media])
+        return [
+            SimpleNamespace(photo=[SimpleNamespace(file_id=self.get_file_id(item.media))])
+            for item in media
+        ]
+
+
+class PhotosTestCase(TestCase):
+    """Тесты с хранилищем file_id и файлами фото во временном каталоге."""
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.bot = FakeTelegram()
+        self.photo_cache = PhotoCache(os.path.join(self.directory.name, "photos.sqlite3"))
+        self.photos = list()
+        for item in range(4):
+            self.photos.append(os.path.join(self.directory.name, f"{item}.jpg"))
+            self.write_photo(item, f"photo{item}".encode())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_photo(self, item: int, data: bytes) -> None:
+        with open(self.photos[item], "wb") as photo:
+            photo.write(data)
+
+
+class TestPhotoCache(PhotosTestCase):
+    def test_send_photo(self):
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.assertEqual(self.bot.sent, [("send_photo", b"photo0"), ("send_photo", "file1")])
+        # file_id сохраняется между запусками бота
+        photo_cache = PhotoCache(os.path.join(self.directory.name, "photos.sqlite3"))
+        self.assertEqual(photo_cache.get_file_id(self.photos[0]), "file1")
+
+    def test_send_photo_rejected_file_id(self):
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.bot.errors["send_photo"] = [get_api_error(400)]
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.assertEqual(self.bot.sent, [("send_photo", b"photo0"), ("send_photo", b"photo0")])
+        self.assertEqual(self.photo_cache.get_file_id(self.photos[0]), "file2")
+
+        # другие ошибки не приводят к повторной загрузке
+        self.bot.errors["send_photo"] = [get_api_error(429)]
+        with self.assertRaises(ApiTelegramException):
+            self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.assertEqual(self.photo_cache.get_file_id(self.photos[0]), "file2")
+
+    def test_send_photo_changed_file(self):
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.write_photo(0, b"new photo0")
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        stat = os.stat(self.photos[0])
+        os.utime(self.photos[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.photo_cache.send_photo(self.bot, 1, self.photos[0])
+        self.assertEqual(
+            self.bot.sent,
+            [("send_photo", b"photo0"), ("send_photo", b"new photo0"), ("send_photo", b"new photo0")],
+        )
+        self.assertEqual(self.photo_cache.get_file_id(self.photos[0]), "file3")
+
+    def test_send_media_group(self):
+        items = [(path, f"caption{item}") for item, path in enumerate(self.photos[:2])]
+        self.photo_cache.send_media_group(self.bot, 1, items)
+        self.photo_cache.send_media_group(self.bot, 1, items)
+        # Telegram не принял file_id - все фото альбома загружаются заново
+        self.bot.errors["send_media_group"] = [get_api_error(400)]
+        self.photo_cache.send_media_group(self.bot, 1, items)
+        self.assertEqual(self.bot.sent, [
+            ("send_media_group", [b"photo0", b"photo1"]),
+            ("send_media_group", ["file1", "file2"]),
+            ("send_media_group", [b"photo0", b"photo1"]),
+        ])
+        self.assertEqual(self.photo_cache.get_file_id(self.photos[1]), "file4")
+
+        # файлы уже загружались заново - повторов больше нет
+        for path in self.photos[:2]:
+            self.photo_cache.delete_file_id(path)
+        self.bot.errors["send_media_group"] = [get_api_error(400)]
+        with self.assertRaises(ApiTelegramException):
+            self.photo_cache.send_media_group(self.bot, 1, items)
+
+
+class TestDelivery(PhotosTestCase):
+    def test_split_caption(self):
+        text = "<b>" + "а" * delivery.CAPTION_LIMIT + "</b>"
+        self.assertEqual(delivery.split_caption(text), (text, None))
+        text = "заголовок\n" + "а" * (delivery.CAPTION_LIMIT - 10)
+        self.assertEqual(delivery.split_caption(text), (text, None))
+        text += "а"
+        self.assertEqual(delivery.split_caption(text), ("заголовок", text))
+
+    def test_join_messages(self):
+        half = delivery.MESSAGE_LIMIT // 2 - 1
+        self.assertEqual(
+            delivery.join_messages(["а" * half, "<b>" + "б" * half + "</b>", "в"]),
+            ["а" * half + "\n\n<b>" + "б" * half + "</b>", "в"],
+        )
+        self.assertEqual(delivery.join_messages(["а" * half, "б" * (half + 1)]), ["а" * half, "б" * (half + 1)])
+        self.assertEqual(delivery.join_messages([]), [])
+
+    def get_items(self) -> list:
+        """Меню из четырех блюд, текст второго не помещается в подпись."""
+
+        texts = ["завтрак", "обед\n" + "а" * delivery.CAPTION_LIMIT, "перекус", "ужин"]
+        return list(zip(self.photos, texts))
+
+    def test_send_album(self):
+        items = self.get_items()
+        delivery.send_album(self.bot, self.photo_cache, 1, items)
+        self.assertEqual(self.bot.sent, [
+            ("send_media_group", [b"photo0", b"photo1", b"photo2", b"photo3"]),
+            ("send_message", items[1][1]),
+        ])
+
+    def test_send_album_text_failed(self):
+        self.bot.errors["send_message"] = [get_api_error(429)]
+        with self.assertLogs("delivery", "ERROR"):
+            delivery.send_album(self.bot, self.photo_cache, 1, self.get_items())
+        # альбом уже отправлен - повторной отправки нет
+        self.assertEqual(self.bot.sent, [
+            ("send_media_group", [b"photo0", b"photo1", b"photo2", b"photo3"]),
+        ])
+
+    def test_send_album_failed(self):
+        items = self.get_items()
+        self.bot.errors["send_media_group"] = [get_api_error(400)]
+        # ранние фото отправляются дольше - порядок держится только ожиданием предыдущих
+        self.bot.delays = {b"photo0": 0.05, b"photo1": 0.02}
+        with self.assertLogs("delivery", "WARNING"):
+            delivery.send_album(self.bot, self.photo_cache, 1, items, workers=4)
+        self.assertEqual(self.bot.sent, [
+            message
+            for item, (_, text) in enumerate(items)
+            for message in (("send_photo", f"photo{item}".encode()), ("send_message", text))
+        ])
+
+    def test_send_in_order_missing_photo(self):
+        items = self.get_items()
+        os.remove(self.photos[2])
+        delivery.send_in_order(self.bot, self.photo_cache, 1, items)
+        self.assertEqual(
+            [data for method, data in self.bot.sent if method == "send_message"],
+            [text for _, text in items],
+        )
+        self.assertEqual(self.bot.uploads, 3)
+
+
+class TestCallbacks(TestCase):
+    def setUp(self):
+        self.calls = list()
+        self.router = CallbackRouter()
+
+        @self.router.action(callbacks.CATEGORY)
+        def category(callback, category_id):
+            self.calls.append((callbacks.CATEGORY, category_id))
+
+        @self.router.action(callbacks.RANDOM_RECIPE)
+        def random_recipe(callback):
+            self.calls.append((callbacks.RANDOM_RECIPE,))
+
+        @self.router.fallback
+        def outdated(callback):
+            self.calls.append(("fallback", callback.data))
+
+    def dispatch(self, data):
+        self.router.dispatch(SimpleNamespace(data=data))
+        return self.calls.pop()
+
+    def test_encode_decode(self):
+        self.assertEqual(encode(callbacks.CATEGORY, 12), "1ct:12")
+        self.assertEqual(decode(encode(callbacks.CATEGORY, 12)), (callbacks.CATEGORY, [12]))
+        self.assertEqual(decode(encode(callbacks.MENU_DAY)), (callbacks.MENU_DAY, []))
+        self.assertEqual(decode(encode(callbacks.RECIPE, 1, 22, 333)), (callbacks.RECIPE, [1, 22, 333]))
+        for data in None, "", "0ct:12", "category_12", "ct:12", "1ct:a", "1ct:1,,2":
+            self.assertIsNone(decode(data))
+
+    def test_encode_size(self):
+        # '1rc:' и число из 60 цифр - ровно 64 байта
+        self.assertEqual(len(encode(callbacks.RECIPE, 10 ** 59)), callbacks.MAX_SIZE)
+        with self.assertRaises(ValueError):
+            encode(callbacks.RECIPE, 10 ** 60)
+
+    def test_router(self):
+        self.assertEqual(self.dispatch("1ct:5"), (callbacks.CATEGORY, 5))
+        self.assertEqual(self.dispatch("1r"), (callbacks.RANDOM_RECIPE,))
+        # старая версия, чужой формат, неизвестное действие и неверное число аргументов
+        for data in "0ct:5", "random_recipe", "1zz", "1ct", "1ct:1,2", "1r:1", None:
+            self.assertEqual(self.dispatch(data), ("fallback", data))
+        with self.assertRaises(ValueError):
+            self.router.action(callbacks.CATEGORY)(lambda callback, category_id: None)
+
+
+class ApiStubRequestHandler(BaseHTTPRequestHandler):
+    """Заглушка API: ответы по пути запроса берутся из очереди server.responses."""
+
+    server: "ApiStubServer"
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        queue = self.server.responses.get(urlsplit(self.path).path)
+        status, result = queue.pop(0) if queue else (404, {"detail": "Not found."})
+        data = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class ApiStubServer(HTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ApiStubRequestHandler)
+        self.requests = list()
+        self.responses = dict()
+
+
+class TestApiClient(TestCase):
+    def setUp(self):
+        self.server = ApiStubServer()
+        Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.url = "http://{}:{}/".format(*self.server.server_address)
+        self.api_client = ApiClient(self.url, timeout=(1, 2), retries=3, backoff_factor=0)
+
+    def tearDown(self):
+        self.api_client.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_all(self):
+        self.server.responses["/api/categories"] = [
+            (200, {"next": self.url + "api/categories?cursor=2", "results": [{"id": 1}, {"id": 2}]}),
+            (200, {"next": self.url + "api/categories?cursor=3", "results": [{"id": 3}]}),
+            (200, {"next": None, "results": [{"id": 4}]}),
+        ]
+        self.assertEqual(
+            [category["id"] for category in self.api_client.get_categories()], [1, 2, 3, 4]
+        )
+        self.assertEqual(
+            self.server.requests,
+            ["/api/categories", "/api/categories?cursor=2", "/api/categories?cursor=3"],
+        )
+
+    def test_retry(self):
+        self.server.responses["/api/random_recipe"] = [
+            (502, {}), (503, {}), (504, {}), (200, {"name": "рецепт1"}),
+        ]
+        self.assertEqual(self.api_client.get_random_recipe(), {"name": "рецепт1"})
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_no_retry_on_500(self):
+        self.server.responses["/api/random_recipe"] = [(500, {}), (200, {"name": "рецепт1"})]
+        with self.assertRaises(HTTPError):
+            self.api_client.get_random_recipe()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_menu_day_not_found(self):
+        self.assertIsNone(self.api_client.get_menu_day())
+
+    def test_timeout(self):
+        self.server.responses["/api/ingredients"] = [(200, {}), (200, {})]
+        self.server.responses["/api/categories"] = [(200, {"next": None, "results": []})]
+        with mock.patch.object(
+            self.api_client.session, "get", wraps=self.api_client.session.get
+        ) as get:
+            self.api_client.get_ingredients()
+            self.api_client.get_ingredients_if_changed('"1"')
+            self.api_client.get_categories()
+        self.assertEqual(get.call_count, 3)
+        for call in get.call_args_list:
+            self.assertEqual(call.kwargs["timeout"], (1, 2))
+
+
+class FakeApiClient:
+    """Клиент API с заданными ответами; запоминает вызовы."""
+
+    def __init__(self):
+        self.calls = list()
+        self.ingredients = {"к": [{"id": 1, "name": "курица"}, {"id": 3, "name": "картофель"}]}
+        self.version = '"1"'
+        self.error = None
+
+    def get_ingredients_if_changed(self, version=None):
+        self.calls.append(("ingredients", version))
+        if self.error is not None:
+            raise self.error
+        if version == self.version:
+            return None, version
+        return self.ingredients, self.version
+
+    def get_categories(self):
+        self.calls.append(("categories",))
+        return [{"id": 1, "name": "завтрак"}]
+
+
+class TestCatalog(TestCase):
+    def setUp(self):
+        self.api_client = FakeApiClient()
+        self.catalog = Catalog(self.api_client, ttl=300)
+
+    def refresh(self):
+        """Обращение к устаревшему снимку и ожидание фонового обновления."""
+
+        self.catalog.ttl = 0
+        snapshot = self.catalog.get()
+        self.catalog.ttl = 300
+        deadline = monotonic() + 5
+        while self.catalog._refreshing and monotonic() < deadline:
+            sleep(0.001)
+        self.assertFalse(self.catalog._refreshing)
+        return snapshot
+
+    def test_lazy_load(self):
+        self.assertEqual(self.api_client.calls, [])
+        snapshot = self.catalog.get()
+        self.assertEqual(self.api_client.calls, [("ingredients", None), ("categories",)])
+        self.assertEqual(snapshot.get_ingredient_names([3, 1, 5]), ["картофель", "курица"])
+        self.assertEqual(snapshot.ingredient_letters, {1: "к", 3: "к"})
+
+    def test_not_modified(self):
+        snapshot = self.catalog.get()
+        # пока идет обновление, возвращается прежний снимок
+        self.assertIs(self.refresh(), snapshot)
+        new_snapshot = self.catalog.get()
+        # 304: данные те же, время загрузки обновлено, категории не запрашивались
+        self.assertIs(new_snapshot.ingredients, snapshot.ingredients)
+        self.assertGreater(new_snapshot.loaded_at, snapshot.loaded_at)
+        self.assertEqual(self.api_client.calls[2:], [("ingredients", '"1"')])
+
+    def test_changed(self):
+        self.catalog.get()
+        self.api_client.version = '"2"'
+        self.api_client.ingredients = {"я": [{"id": 5, "name": "яблоко"}]}
+        self.refresh()
+        self.assertEqual(self.catalog.get().ingredient_names, {5: "яблоко"})
+
+    def test_refresh_failed(self):
+        snapshot = self.catalog.get()
+        self.api_client.error = ConnectionError("API is unavailable")
+        with self.assertLogs("catalog", "ERROR"):
+            self.refresh()
+        self.assertIs(self.catalog.get(), snapshot)
+
+
+class TestStateStore(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_state_store(self):
+        for store in MemoryStateStore(), SqliteStateStore(self.path):
+            self.assertEqual(store.toggle_category(1, 5), Selection(frozenset({5})))
+            self.assertEqual(store.toggle_ingredient(1, 12), Selection(frozenset({5}), frozenset({12})))
+            self.assertEqual(store.toggle_category(1, 5), Selection(ingredients=frozenset({12})))
+            self.assertEqual(store.get(1), Selection(ingredients=frozenset({12})))
+            self.assertEqual(store.clear_ingredients(1), Selection())
+            self.assertEqual(len(store), 0)
+
+    def test_max_users(self):
+        for store in MemoryStateStore(max_users=3), SqliteStateStore(self.path, max_users=3):
+            for user_id in range(5):
+                store._cleaned_at = 0
+                store.toggle_category(user_id, 1)
+            self.assertEqual(len(store), 3)
+            self.assertEqual(store.get(0), Selection())
+            self.assertEqual(store.get(4), Selection(frozenset({1})))
+
+    def test_sqlite_concurrent_toggles(self):
+        # отдельные соединения - как у разных процессов бота
+        stores = [SqliteStateStore(self.path) for _ in range(4)]
+
+        def toggle(store, start):
+            for category_id in range(start, 200, len(stores)):
+                store.toggle_category(1, category_id)
+
+        threads = [Thread(target=toggle, args=(store, item)) for item, store in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stores[0].get(1).categories, frozenset(range(200)))
+
+
+class TestChatDispatcher(TestCase):
+    def setUp(self):
+        self.dispatcher = ChatDispatcher(workers=4)
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    def test_order_in_chat(self):
+        done = list()
+        for item in range(20):
+            self.dispatcher.submit(1, lambda item=item: done.append(item) or sleep(0.001 * (item % 3)))
+        self.dispatcher.shutdown()
+        self.assertEqual(done, list(range(20)))
+
+    def test_chats_in_parallel(self):
+        started = Event()
+        finished = Event()
+
+        def wait_other_chat():
+            started.set()
+            finished.wait(1)
+
+        # задача чата 2 выполняется, пока задача чата 1 еще не завершена
+        self.dispatcher.submit(1, wait_other_chat)
+        self.assertTrue(started.wait(1))
+        self.dispatcher.submit(2, finished.set)
+        self.assertTrue(finished.wait(0.5))
+
+    def test_error_in_task(self):
+        done = list()
+        with self.assertLogs("webhook", "ERROR"):
+            self.dispatcher.submit(1, lambda: 1 / 0)
+            self.dispatcher.submit(1, lambda: done.append(1))
+            self.dispatcher.shutdown()
+        self.assertEqual(done, [1])
+
+
+class TestWebhookServer(TestCase):
+    def setUp(self):
+        self.bot = FakeBot(delay=0.01)
+        self.server = WebhookServer(
+            self.bot, ("127.0.0.1", 0), path="/webhook", secret_token="secret", workers=4
+        )
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def post(self, body, path: str = "/webhook", secret: str = "secret", headers=None) -> int:
+        """Отправка обновления на сервер. Возвращает код ответа."""
+
+        connection = HTTPConnection(*self.server.server_address, timeout=5)
+        try:
+            headers = {SECRET_HEADER: secret, **(headers or {})}
+            if isinstance(body, dict):
+                body = json.dumps(body)
+            connection.request("POST", path, body=body, headers=headers)
+            return connection.getresponse().status
+        finally:
+            connection.close()
+
+    def test_webhook(self):
+        self.bot.expected = 30
+        updates = [get_update(update_id, update_id % 3 + 1) for update_id in range(30)]
+        for update in updates:
+            self.assertEqual(self.post(update), 200)
+        self.assertTrue(self.bot.processed.wait(5))
+        for chat_id in 1, 2, 3:
+            self.assertEqual(
+                self.bot.chats[chat_id],
+                [update["update_id"] for update in updates if update["update_id"] % 3 + 1 == chat_id],
+            )
+
+    def test_webhook_errors(self):
+        update = get_update(1, 1)
+        self.assertEqual(self.post(update, path="/"), 404)
+        self.assertEqual(self.post(update, secret="wrong"), 403)
+        self.assertEqual(self.post(update, secret=""), 403)
+        self.assertEqual(self.post("{"), 400)
+        self.assertEqual(self.post("[]"), 400)
+        self.assertEqual(self.post(update, headers={"Content-Length": "abc"}), 400)
+        self.assertEqual(self.post(update, headers={"Content-Length": "-1"}), 400)
+        self.assertEqual(self.post("", headers={"Content-Length": str(MAX_BODY_SIZE + 1)}), 413)
+        self.assertEqual(self.bot.chats, dict())
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка Bot API и API кулинарной книги.
+
+    Запросы запоминаются (метод Bot API или путь API и параметры). На любой
+    метод Bot API отвечает сообщением, на запросы к API - пустым каталогом.
+    """
+
+    server: "StubServer"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path.startswith("/bot"):
+            self.server.requests.append((url.path.rsplit("/", 1)[-1], params))
+            result = {"ok": True, "result": {
+                "message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"},
+            }}
+        else:
+            self.server.requests.append((url.path, params))
+            result = {} if url.path == "/api/ingredients" else {"next": None, "results": []}
+        data = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_POST = do_GET
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubServer(HTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubRequestHandler)
+        self.requests = list()
+
+
+class TestHandlers(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = TemporaryDirectory()
+        cls.server = StubServer()
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+        url = "http://{}:{}".format(*cls.server.server_address)
+        cls.environ = mock.patch.dict(os.environ, {
+            "API_TOKEN": "1:test",
+            "URL": url + "/",
+            "TELEGRAM_API_URL": url + "/bot{0}/{1}",
+            "BOT_BACKEND": "http",
+            "STATE_BACKEND": "memory",
+            "PHOTO_CACHE_PATH": os.path.join(cls.directory.name, "photos.sqlite3"),
+        })
+        cls.environ.start()
+        cls.handlers = importlib.import_module("handlers")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.environ.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests.clear()
+
+    def dispatch(self, data: str) -> list:
+        """Нажатие кнопки с callback_data. Возвращает запросы к Bot API и API."""
+
+        callback = SimpleNamespace(
+            id="1", data=data, message=SimpleNamespace(chat=SimpleNamespace(id=1), message_id=1)
+        )
+        self.handlers.router.dispatch(callback)
+        return [method for method, _ in self.server.requests]
+
+    def test_letter_out_of_range(self):
+        for symbol in len(self.handlers.utils.ALPHABET), 40, -1:
+            with self.subTest(symbol):
+                self.server.requests.clear()
+                requests = self.dispatch(callbacks.encode(callbacks.LETTER, symbol))
+                self.assertEqual(requests, ["answerCallbackQuery", "sendMessage"])
+
+    def test_send_expired_selection(self):
+        for data in (
+            callbacks.encode(callbacks.CATEGORIES_SEND, callbacks.SELECT),
+            callbacks.encode(callbacks.INGREDIENTS_FIND),
+            callbacks.encode(callbacks.INGREDIENTS_SEND, callbacks.ASIDE),
+        ):
+            with self.subTest(data):
+                self.server.requests.clear()
+                requests = self.dispatch(data)
+                # рецепты не запрашиваются, выбор предлагается заново
+                self.assertFalse([path for path in requests if path.startswith("/api/recipes")])
+                self.assertEqual(requests[0], "answerCallbackQuery")
+                self.assertEqual(requests[-1], "sendMessage")
+
+    def test_send_selection(self):
+        self.handlers.state.toggle_category(1, 5)
+        self.handlers.state.toggle_category(1, 7)
+        self.dispatch(callbacks.encode(callbacks.CATEGORIES_SEND, callbacks.SELECT))
+        self.handlers.state.clear(1)
+        self.assertIn(
+            ("/api/recipes/categories/select", {"categories": "5,7"}), self.server.requests
+        )
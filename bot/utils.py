@@ -1,8 +1,14 @@
 import json
+from functools import lru_cache
 from typing import List
 
 from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+import callbacks
+from keyboards import Button, Rows, get_keyboard, get_rows
+
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщэюя"
+
 
 def get_inline_keyboard_column(buttons: List[InlineKeyboardButton]) -> InlineKeyboardMarkup:
     """ Функция для создания встроенной клавиатуры в столбик. """
@@ -27,22 +33,27 @@ def get_inline_keyboard_row(buttons: List[InlineKeyboardButton], row_count: int
     return keyboard
 
 
-def get_main_menu() -> InlineKeyboardMarkup:
-    """ Функция для создания клавиатуры главного меню. """
+@lru_cache(maxsize=None)
+def get_main_menu_rows() -> Rows:
+    """ Функция для создания рядов кнопок главного меню (один раз). """
 
     main_button_data = [
-        {"text": "Случайный рецепт", "callback_data": "random_recipe"},
-        {"text": "Меню на день", "callback_data": "menu_day"},
-        {"text": "Поиск по категориям", "callback_data": "search_by_category"},
-        {"text": "Поиск по ингредиентам", "callback_data": "search_by_ingredients"},
+        {"text": "Случайный рецепт", "callback_data": callbacks.encode(callbacks.RANDOM_RECIPE)},
+        {"text": "Меню на день", "callback_data": callbacks.encode(callbacks.MENU_DAY)},
+        {"text": "Поиск по категориям", "callback_data": callbacks.encode(callbacks.CATEGORIES)},
+        {"text": "Поиск по ингредиентам", "callback_data": callbacks.encode(callbacks.INGREDIENTS)},
     ]
     buttons = [
-        InlineKeyboardButton(
-            text=button_data.get("text"), callback_data=button_data.get("callback_data")
-        )
+        Button(text=button_data.get("text"), callback_data=button_data.get("callback_data"))
         for button_data in main_button_data
     ]
-    return get_inline_keyboard_column(buttons)
+    return get_rows(buttons, row_count=1)
+
+
+def get_main_menu() -> InlineKeyboardMarkup:
+    """ Функция для получения клавиатуры главного меню. """
+
+    return get_keyboard(get_main_menu_rows())
 
 
 def get_recipe_message(recipe_data: json) -> str:
@@ -66,21 +77,25 @@ def get_keyboard_recipes(recipes_data: json) -> InlineKeyboardMarkup:
     buttons = [
         InlineKeyboardButton(
             text=recipe.get("name").capitalize(),
-            callback_data=f"recipe {recipe.get('id')}"
+            callback_data=callbacks.encode(callbacks.RECIPE, recipe.get("id"))
         )
         for recipe in recipes_data
     ]
     return get_inline_keyboard_row(buttons=buttons, row_count=2)
 
 
-def get_keyboard_startswith_ingredients() -> InlineKeyboardMarkup:
-    """ Функция для получения inline-меню с началом названий блюд (алфавит). """
+@lru_cache(maxsize=None)
+def get_startswith_ingredients_rows() -> Rows:
+    """ Функция для создания рядов кнопок с началом названий блюд (один раз). """
 
     buttons = [
-        InlineKeyboardButton(
-            text=symbol + "...",
-            callback_data=f"sbi {symbol}"
-        )
-        for symbol in "абвгдежзийклмнопрстуфхцчшщэюя"
+        Button(text=symbol + "...", callback_data=callbacks.encode(callbacks.LETTER, index))
+        for index, symbol in enumerate(ALPHABET)
     ]
-    return get_inline_keyboard_row(buttons=buttons, row_count=4)
+    return get_rows(buttons, row_count=4)
+
+
+def get_keyboard_startswith_ingredients() -> InlineKeyboardMarkup:
+    """ Функция для получения inline-меню с началом названий блюд (алфавит). """
+
+    return get_keyboard(get_startswith_ingredients_rows())
@@ -0,0 +1,171 @@
+import hmac
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Lock
+from typing import Callable, Deque, Dict, Optional
+
+from telebot import TeleBot
+from telebot.types import Update
+
+logger = logging.getLogger(__name__)
+
+# заголовок с секретом, указанным при установке webhook (setWebhook secret_token)
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# ограничение размера тела запроса с обновлением
+MAX_BODY_SIZE = 1024 * 1024
+
+
+def get_chat_id(update: Update) -> Optional[int]:
+    """Функция для получения id чата, к которому относится обновление."""
+
+    message = update.message or update.edited_message
+    if message is None and update.callback_query is not None:
+        message = update.callback_query.message
+        if message is None:
+            return update.callback_query.from_user.id
+    return message.chat.id if message is not None else None
+
+
+class ChatDispatcher:
+    """
+    Выполнение задач в пуле потоков с сохранением порядка внутри чата.
+
+    Задачи разных чатов выполняются параллельно, а задачи одного чата -
+    строго по очереди: пока чат обрабатывается, новые задачи ставятся
+    в его очередь и выполняются тем же потоком.
+    """
+
+    def __init__(self, workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat")
+        self._lock = Lock()
+        self._queues: Dict[Optional[int], Deque[Callable[[], None]]] = dict()
+
+    def submit(self, chat_id: Optional[int], task: Callable[[], None]) -> None:
+        """Постановка задачи в очередь чата chat_id."""
+
+        with self._lock:
+            queue = self._queues.get(chat_id)
+            if queue is not None:
+                queue.append(task)
+                return
+            self._queues[chat_id] = deque((task,))
+        self._executor.submit(self._run, chat_id)
+
+    def _run(self, chat_id: Optional[int]) -> None:
+        """Выполнение задач чата, пока его очередь не опустеет."""
+
+        queue = self._queues[chat_id]
+        while True:
+            with self._lock:
+                if not queue:
+                    del self._queues[chat_id]
+                    return
+                task = queue.popleft()
+            try:
+                task()
+            except Exception:
+                logger.exception("Update processing failed (chat %s)", chat_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class WebhookServer(HTTPServer):
+    """
+    HTTP-сервер для приема обновлений Telegram (webhook).
+
+    Запрос только разбирается и ставится в очередь чата, поэтому ответ
+    Telegram отправляется сразу, а обработка идет в пуле потоков.
+    """
+
+    def __init__(
+        self,
+        bot: TeleBot,
+        address: tuple,
+        path: str = "/",
+        secret_token: Optional[str] = None,
+        workers: int = 4,
+    ):
+        super().__init__(address, WebhookRequestHandler)
+        self.bot = bot
+        self.webhook_path = path
+        self.secret_token = secret_token
+        self.dispatcher = ChatDispatcher(workers)
+
+    def process_update(self, update: Update) -> None:
+        """Постановка обновления в очередь его чата."""
+
+        self.dispatcher.submit(
+            get_chat_id(update), lambda: self.bot.process_new_updates([update])
+        )
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.dispatcher.shutdown()
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик POST-запросов Telegram с обновлениями."""
+
+    server: WebhookServer
+
+    def do_POST(self) -> None:
+        if self.path != self.server.webhook_path:
+            self.send_error(404)
+            return
+        secret_token = self.server.secret_token
+        if secret_token and not hmac.compare_digest(
+            self.headers.get(SECRET_HEADER, ""), secret_token
+        ):
+            self.send_error(403)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error(400)
+            return
+        if length > MAX_BODY_SIZE:
+            self.send_error(413)
+            return
+        try:
+            update = Update.de_json(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError, TypeError):
+            self.send_error(400)
+            return
+        self.server.process_update(update)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+def run_webhook(
+    bot: TeleBot,
+    url: str,
+    host: str = "0.0.0.0",
+    port: int = 8443,
+    path: str = "/",
+    secret_token: Optional[str] = None,
+    workers: int = 4,
+) -> None:
+    """
+    Функция для запуска бота в режиме webhook.
+
+    url - внешний адрес, по которому Telegram отправляет обновления
+    (например, через обратный прокси с TLS на host:port).
+    """
+
+    server = WebhookServer(bot, (host, port), path, secret_token, workers)
+    bot.remove_webhook()
+    bot.set_webhook(url=url, secret_token=secret_token)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -8,7 +8,9 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import path
 
+from .importers import BATCH_SIZE, RecipeImporter, import_names
 from .models import Category, CountIngredients, Ingredient, Recipe
+from .signals import reset_catalog
 
 
 class CSVForm(forms.Form):
@@ -67,6 +69,7 @@ class BaseAdmin(admin.ModelAdmin):
             )
 
             result = self.upload_data_to_db(csv_file)
+            reset_catalog()
 
             if result:
                 message = "Data from the csv-file successfully uploaded to db."
@@ -89,14 +92,7 @@ class IngredientAdmin(BaseAdmin):
         return "ingredient"
 
     def upload_data_to_db(self, csv_file: TextIOWrapper) -> bool:
-        current_ingredients = Ingredient.objects.all().values_list("name", flat=True)
-        reader = DictReader(csv_file)
-        ingredients = [
-            Ingredient(**row)
-            for row in reader
-            if row["name"] not in current_ingredients
-        ]
-        return len(Ingredient.objects.bulk_create(ingredients)) > 0
+        return import_names(Ingredient, DictReader(csv_file), ["always_available"]) > 0
 
 
 @admin.register(Category)
@@ -110,12 +106,7 @@ class CategoryAdmin(BaseAdmin):
         return "category"
 
     def upload_data_to_db(self, csv_file: TextIOWrapper) -> bool:
-        current_categories = Category.objects.all().values_list("name", flat=True)
-        reader = DictReader(csv_file)
-        categories = [
-            Category(**row) for row in reader if row["name"] not in current_categories
-        ]
-        return len(Category.objects.bulk_create(categories)) > 0
+        return import_names(Category, DictReader(csv_file)) > 0
 
 
 class CountIngredientsInline(admin.TabularInline):
@@ -134,85 +125,11 @@ class RecipeAdmin(BaseAdmin):
         return "recipe"
 
     def upload_data_to_db(self, csv_file: TextIOWrapper) -> bool:
-        always_available_ingredients = [
-            "сахар",
-            "соль",
-            "вода",
-            "перец чёрный",
-            "сода",
-            "масло растительное",
-            "чеснок",
-            "чай чёрный",
-        ]
-
-        reader = DictReader(csv_file, delimiter=";")
-        recipes_full = [row for row in reader]
-
-        current_categories = {
-            category.name: category.id for category in Category.objects.all()
-        }
-        current_ingredients = {
-            ingredient.name: ingredient.id for ingredient in Ingredient.objects.all()
-        }
-
-        recipes_ingredients = set()
-        recipes_categories = set()
-
-        for recipe in recipes_full:
-            for recipe_ingredient in recipe.get("ingredients").split(","):
-                ingredient = recipe_ingredient.split(":")[0]
-                if ingredient not in current_ingredients:
-                    recipes_ingredients.add(ingredient)
-            for recipe_category in recipe.get("categories").split(","):
-                if recipe_category not in current_categories:
-                    recipes_categories.add(recipe_category)
-
-        ingredients = [
-            Ingredient(
-                name=ingredient,
-                always_available=True
-                if ingredient in always_available_ingredients
-                else False,
-            )
-            for ingredient in recipes_ingredients
-        ]
-
-        categories_obj = Category.objects.bulk_create(
-            [Category(name=category) for category in recipes_categories]
-        )
-        categories_id = {
-            category_obj.name: category_obj.id for category_obj in categories_obj
-        }
-        current_categories.update(**categories_id)
-        ingredients_obj = Ingredient.objects.bulk_create(ingredients)
-        ingredients_id = {
-            ingredient_obj.name: ingredient_obj.id for ingredient_obj in ingredients_obj
-        }
-        current_ingredients.update(**ingredients_id)
-
-        recipes = [
-            {
-                "recipe_obj": Recipe.objects.create(
-                    name=recipe.get("name"),
-                    cooking_time=recipe.get("cooking_time"),
-                    description=recipe.get("description"),
-                ),
-                "recipe_data": recipe,
-            }
-            for recipe in recipes_full
-        ]
-        for recipe in recipes:
-            for category in recipe["recipe_data"]["categories"].split(","):
-                recipe["recipe_obj"].categories.add(current_categories[category])
-                recipe["recipe_obj"].save()
-
-            for ingredient in recipe["recipe_data"]["ingredients"].split(","):
-                ingredient_info = ingredient.split(":")
-                CountIngredients.objects.create(
-                    recipe_id=recipe["recipe_obj"].id,
-                    ingredient_id=current_ingredients[ingredient_info[0]],
-                    count=ingredient_info[1],
-                    optional=ingredient_info[2],
-                )
-
-        return len(recipes) > 0
+        """
+        Функция для добавления рецептов из файла в БД.
+
+        Файл читается построчно, все данные добавляются в одной транзакции
+        пакетными запросами (см. RecipeImporter).
+        """
+
+        return RecipeImporter(batch_size=BATCH_SIZE).import_file(csv_file) > 0
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from hashlib import md5
+from threading import Lock
+from time import time_ns
+from typing import Generic, Optional, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "api:catalog_version"
+
+T = TypeVar("T")
+
+
+def get_catalog_version() -> int:
+    """
+    Получение текущей версии каталога.
+
+    Версия - время последнего изменения каталога в наносекундах, поэтому
+    после вытеснения ключа из кэша она не совпадет ни с одной из прежних.
+    """
+
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """Обновление версии каталога - все ответы из кэша становятся неактуальными."""
+
+    cache.set(CATALOG_VERSION_KEY, time_ns(), timeout=None)
+
+
+def get_catalog_etag(request: HttpRequest, *args, **kwargs) -> str:
+    """ETag ответа - версия каталога."""
+
+    return str(get_catalog_version())
+
+
+def get_catalog_last_modified(request: HttpRequest, *args, **kwargs) -> datetime:
+    """Время последнего изменения каталога."""
+
+    return datetime.fromtimestamp(get_catalog_version() / 10**9, tz=timezone.utc)
+
+
+class CatalogIndex(ABC, Generic[T]):
+    """
+    Базовый класс для данных, построенных по каталогу и хранимых в памяти процесса.
+
+    Данные строятся при первом обращении и перестраиваются, как только
+    меняется версия каталога (в т.ч. в другом процессе при общем кэше).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._index: Optional[Tuple[int, T]] = None
+
+    @abstractmethod
+    def load(self) -> T:
+        """Загрузка данных из БД."""
+
+    def build(self) -> T:
+        """Построение данных для текущей версии каталога."""
+
+        version = get_catalog_version()
+        data = self.load()
+        with self._lock:
+            self._index = version, data
+        return data
+
+    def invalidate(self) -> None:
+        """Сброс данных. Будут построены заново при следующем обращении."""
+
+        with self._lock:
+            self._index = None
+
+    def get(self) -> T:
+        """Получение данных, актуальных для текущей версии каталога."""
+
+        index = self._index
+        if index is None or index[0] != get_catalog_version():
+            return self.build()
+        return index[1]
+
+
+def get_response_key(request: Request) -> str:
+    """
+    Формирование ключа кэша для ответа по адресу и параметрам запроса.
+
+    Параметры сортируются, значения-списки (через запятую) сортируются
+    и очищаются от повторов: "2,1,2" и "1,2" дают один ключ. Схема и хост
+    входят в ключ: ссылки next/previous в ответе - абсолютные.
+    """
+
+    params = list()
+    for name in sorted(request.query_params):
+        values = set()
+        for value in request.query_params.getlist(name):
+            values.update(item.strip() for item in value.split(","))
+        params.append(f"{name}={','.join(sorted(values))}")
+    query = md5("&".join(params).encode()).hexdigest()
+    url = f"{request.scheme}://{request.get_host()}{request.path}"
+    return f"api:response:{get_catalog_version()}:{url}:{query}"
+
+
+class CachedResponseMixin:
+    """Кэширование ответов представления до изменения каталога."""
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        key = get_response_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов по версии каталога.
+
+    Ответ содержит заголовки ETag и Last-Modified; на If-None-Match
+    (If-Modified-Since) с актуальной версией возвращается 304 без запросов к БД.
+    """
+
+    @method_decorator(
+        condition(
+            etag_func=get_catalog_etag, last_modified_func=get_catalog_last_modified
+        )
+    )
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        return super().get(request, *args, **kwargs)
@@ -0,0 +1,281 @@
+from contextlib import nullcontext
+from csv import DictReader
+from itertools import islice
+from time import monotonic
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Type
+
+from django.db import models, transaction
+
+from .models import Category, CountIngredients, Ingredient, Recipe
+
+ALWAYS_AVAILABLE_INGREDIENTS = [
+    "сахар",
+    "соль",
+    "вода",
+    "перец чёрный",
+    "сода",
+    "масло растительное",
+    "чеснок",
+    "чай чёрный",
+]
+# число строк файла в одном пакете (и в одном запросе bulk_create)
+BATCH_SIZE = 500
+
+
+def normalize_name(name: str) -> str:
+    """Функция для приведения названия к виду для сравнения (регистр, ё/е, пробелы)."""
+
+    return name.strip().casefold().replace("ё", "е")
+
+
+# нормализованные названия ALWAYS_AVAILABLE_INGREDIENTS
+ALWAYS_AVAILABLE = {normalize_name(name) for name in ALWAYS_AVAILABLE_INGREDIENTS}
+
+
+def import_names(
+    model: Type[models.Model],
+    rows: Iterable[dict],
+    update_fields: Iterable[str] = (),
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Функция для импорта справочника с уникальным названием (ингредиенты, категории).
+
+    Записи сопоставляются по нормализованному названию (normalize_name)
+    через словарь, поэтому импорт линеен по числу строк. Новые записи
+    добавляются, у существующих обновляются поля update_fields (upsert);
+    повторы названия в файле учитываются один раз. Возвращает число
+    добавленных и измененных записей.
+    """
+
+    update_fields = list(update_fields)
+    new_objects = list()
+    changed_objects = list()
+    with transaction.atomic():
+        current = {
+            normalize_name(obj.name): obj
+            for obj in model.objects.only("id", "name", *update_fields)
+        }
+        seen = set()
+        for row in rows:
+            key = normalize_name(row["name"])
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            values = {
+                field: model._meta.get_field(field).to_python(row[field])
+                for field in update_fields
+                if row.get(field) not in (None, "")
+            }
+            obj = current.get(key)
+            if obj is None:
+                new_objects.append(model(name=row["name"].strip(), **values))
+            elif any(getattr(obj, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(obj, field, value)
+                changed_objects.append(obj)
+        model.objects.bulk_create(new_objects, batch_size=batch_size)
+        if changed_objects:
+            model.objects.bulk_update(changed_objects, update_fields, batch_size=batch_size)
+    return len(new_objects) + len(changed_objects)
+
+
+def read_recipes(csv_file: TextIO) -> Iterator[dict]:
+    """Функция для построчного чтения рецептов из CSV-файла (разделитель ';')."""
+
+    return DictReader(csv_file, delimiter=";")
+
+
+def parse_ingredient(spec: str) -> Tuple[str, str, str]:
+    """Функция для разбора ингредиента рецепта 'название:количество:optional'."""
+
+    name, count, optional = spec.split(":")[:3]
+    return name, count, optional
+
+
+def get_batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    """Функция для разбиения строк на пакеты (строки читаются лениво)."""
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class RecipeImporter:
+    """
+    Импорт рецептов из CSV-файла пакетами.
+
+    Файл читается построчно, в памяти одновременно находится только один
+    пакет строк (и справочники id категорий и ингредиентов). Каждый пакет
+    добавляется в БД несколькими запросами bulk_create.
+
+    atomic - весь импорт в одной транзакции, иначе каждый пакет
+    фиксируется отдельно. progress - функция, которая вызывается после
+    каждого пакета с числом обработанных строк и скоростью (строк/с).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = BATCH_SIZE,
+        atomic: bool = True,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ):
+        self.batch_size = batch_size
+        self.atomic = atomic
+        self.progress = progress
+        self.categories: Dict[str, int] = dict()
+        self.ingredients: Dict[str, int] = dict()
+
+    def import_file(self, csv_file: TextIO) -> int:
+        """Импорт рецептов из файла. Возвращает число добавленных рецептов."""
+
+        return self.import_rows(read_recipes(csv_file))
+
+    def import_rows(self, rows: Iterable[dict]) -> int:
+        """Импорт рецептов из строк CSV. Возвращает число добавленных рецептов."""
+
+        with transaction.atomic() if self.atomic else nullcontext():
+            self.categories = {
+                normalize_name(name): pk for name, pk in Category.objects.values_list("name", "id")
+            }
+            self.ingredients = {
+                normalize_name(name): pk
+                for name, pk in Ingredient.objects.values_list("name", "id")
+            }
+            count = 0
+            start = monotonic()
+            for batch in get_batches(rows, self.batch_size):
+                if self.atomic:
+                    self.import_batch(batch)
+                else:
+                    with transaction.atomic():
+                        self.import_batch(batch)
+                count += len(batch)
+                if self.progress is not None:
+                    self.progress(count, count / max(monotonic() - start, 1e-6))
+        return count
+
+    def add_names(self, names: Dict[str, int], model, new_names: Dict[str, str]) -> None:
+        """
+        Добавление в БД отсутствующих категорий или ингредиентов и их id в справочник.
+
+        new_names - нормализованное название: название в том виде, как в файле.
+        """
+
+        if model is Ingredient:
+            objects = [
+                Ingredient(name=name, always_available=key in ALWAYS_AVAILABLE)
+                for key, name in new_names.items()
+            ]
+        else:
+            objects = [model(name=name) for name in new_names.values()]
+        for obj in model.objects.bulk_create(objects, batch_size=self.batch_size):
+            names[normalize_name(obj.name)] = obj.id
+
+    def import_batch(self, rows: List[dict]) -> None:
+        """Добавление пакета рецептов: рецепты, их категории и ингредиенты."""
+
+        recipes_categories = list()
+        recipes_ingredients = list()
+        for row in rows:
+            recipes_categories.append(row["categories"].split(","))
+            recipes_ingredients.append(
+                [parse_ingredient(spec) for spec in row["ingredients"].split(",")]
+            )
+
+        self.add_names(self.categories, Category, {
+            normalize_name(category): category.strip()
+            for categories in recipes_categories
+            for category in categories
+            if normalize_name(category) not in self.categories
+        })
+        self.add_names(self.ingredients, Ingredient, {
+            normalize_name(name): name.strip()
+            for ingredients in recipes_ingredients
+            for name, _, _ in ingredients
+            if normalize_name(name) not in self.ingredients
+        })
+
+        recipes_obj = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    name=row.get("name"),
+                    cooking_time=row.get("cooking_time"),
+                    description=row.get("description"),
+                )
+                for row in rows
+            ],
+            batch_size=self.batch_size,
+        )
+
+        RecipeCategories = Recipe.categories.through
+        RecipeCategories.objects.bulk_create(
+            [
+                RecipeCategories(recipe_id=recipe_obj.id, category_id=category_id)
+                for recipe_obj, categories in zip(recipes_obj, recipes_categories)
+                # одинаковые категории в строке добавляются один раз (как categories.add)
+                for category_id in dict.fromkeys(
+                    self.categories[normalize_name(category)] for category in categories
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+        CountIngredients.objects.bulk_create(
+            [
+                CountIngredients(
+                    recipe_id=recipe_obj.id,
+                    ingredient_id=self.ingredients[normalize_name(name)],
+                    count=count,
+                    optional=optional,
+                )
+                for recipe_obj, ingredients in zip(recipes_obj, recipes_ingredients)
+                for name, count, optional in ingredients
+            ],
+            batch_size=self.batch_size,
+        )
+
+
+def load_fixture(objects: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+    """
+    Функция для загрузки фикстуры (формат dumpdata/loaddata) пакетными запросами.
+
+    В отличие от loaddata объекты не сохраняются по одному и сигналы не
+    вызываются. id из фикстуры сохраняются. Возвращает число рецептов.
+    """
+
+    ingredients = list()
+    categories = list()
+    recipes = list()
+    recipes_categories = list()
+    count_ingredients = list()
+    RecipeCategories = Recipe.categories.through
+    for obj in objects:
+        fields = dict(obj["fields"])
+        pk = obj.get("id", obj.get("pk"))
+        if obj["model"] == "api.ingredient":
+            ingredients.append(Ingredient(id=pk, **fields))
+        elif obj["model"] == "api.category":
+            categories.append(Category(id=pk, **fields))
+        elif obj["model"] == "api.recipe":
+            recipes_categories.extend(
+                RecipeCategories(recipe_id=pk, category_id=category_id)
+                for category_id in dict.fromkeys(fields.pop("categories", ()))
+            )
+            recipes.append(Recipe(id=pk, **fields))
+        elif obj["model"] == "api.countingredients":
+            count_ingredients.append(CountIngredients(id=pk, **fields))
+        else:
+            raise ValueError(f"Unsupported fixture model: {obj['model']}")
+
+    for model, model_objects in (
+        (Ingredient, ingredients),
+        (Category, categories),
+        (Recipe, recipes),
+        (RecipeCategories, recipes_categories),
+        (CountIngredients, count_ingredients),
+    ):
+        model.objects.bulk_create(model_objects, batch_size=batch_size)
+    return len(recipes)
@@ -0,0 +1,44 @@
+from typing import Dict, List
+
+from .caching import CatalogIndex
+from .models import Ingredient
+from .serializers import ALPHABET, IngredientShortSerializer
+
+
+class IngredientLetterIndex(CatalogIndex[Dict[str, List[dict]]]):
+    """
+    Индекс ингредиентов по первой букве названия.
+
+    Хранит уже сериализованные данные, поэтому ответ не требует ни запросов
+    к БД, ни работы сериализаторов.
+    """
+
+    @staticmethod
+    def get_letter(name: str) -> str:
+        """Буква, по которой ингредиент попадает в индекс."""
+
+        return name[:1].lower().replace("ё", "е")
+
+    def load(self) -> Dict[str, List[dict]]:
+        """Сериализованные ингредиенты по буквам (один запрос)."""
+
+        buckets = {symbol: list() for symbol in ALPHABET}
+        ingredients = Ingredient.objects.only("id", "name").order_by("name")
+        for ingredient in IngredientShortSerializer(ingredients, many=True).data:
+            bucket = buckets.get(self.get_letter(ingredient["name"]))
+            if bucket is not None:
+                bucket.append(ingredient)
+        return buckets
+
+    def get_all(self) -> Dict[str, List[dict]]:
+        """Все ингредиенты, разбитые по буквам."""
+
+        return self.get()
+
+    def get_bucket(self, symbol: str) -> List[dict]:
+        """Ингредиенты, название которых начинается с указанной буквы."""
+
+        return self.get().get(self.get_letter(symbol), list())
+
+
+ingredient_letters = IngredientLetterIndex()
@@ -1,44 +1,91 @@
 import json
 import os
-from csv import DictReader
+from tempfile import NamedTemporaryFile
+from typing import Optional, TextIO
 
 from django.core.management import BaseCommand
 
 from cookbook.settings import BASE_DIR
+from api.importers import ALWAYS_AVAILABLE_INGREDIENTS, parse_ingredient, read_recipes
 from api.models import Recipe
 
 api_dir = os.path.join(BASE_DIR, "api")
 data_dir = os.path.join(api_dir, "data")
+recipes_csv = os.path.join(data_dir, "recipes.csv")
 
 
-always_available_ingredients = [
-    "сахар",
-    "соль",
-    "вода",
-    "перец чёрный",
-    "сода",
-    "масло растительное",
-    "чеснок",
-    "чай чёрный"
-]
+class FixtureWriter:
+    """
+    Потоковая запись фикстуры (json-списка объектов) в файл.
+
+    Объекты записываются по одному, поэтому список целиком в памяти не
+    хранится. compact - без отступов (по объекту на строку), иначе - в
+    том же виде, что json.dump(..., indent=2). Запись идет во временный
+    файл, который заменяет path только при успешном завершении.
+    """
+
+    def __init__(self, path: str, compact: bool = False):
+        self.path = path
+        self.compact = compact
+        self.count = 0
+        self.file: Optional[TextIO] = None
+
+    def __enter__(self) -> "FixtureWriter":
+        self.file = NamedTemporaryFile(
+            "w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(self.path)),
+            suffix=".tmp", delete=False,
+        )
+        self.file.write("[")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.file.write("\n]" if self.count else "]")
+            self.file.close()
+            if exc_type is None:
+                os.chmod(self.file.name, 0o644)
+                os.replace(self.file.name, self.path)
+        finally:
+            if os.path.exists(self.file.name):
+                os.remove(self.file.name)
+
+    def write(self, obj: dict) -> None:
+        if self.compact:
+            data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        else:
+            # не textwrap.indent: он делит и по U+2028 и т.п., которые json.dumps
+            # оставляет внутри строк; настоящие переводы строк в строках экранированы
+            data = "  " + json.dumps(obj, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.file.write(("," if self.count else "") + "\n" + data)
+        self.count += 1
 
 
 class Command(BaseCommand):
     """Команда для перевода данных из csv-файла в json-файл для loaddata."""
 
-    def handle(self, *args, **options):
-        with open(os.path.join(data_dir, "recipes.csv"), "r") as csv_file:
-            recipes_data = DictReader(csv_file, delimiter=";")
-            recipes_full = [row for row in recipes_data]
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default=os.path.join(data_dir, "recipes.json"),
+            help="Путь к json-файлу.",
+        )
+        parser.add_argument(
+            "--compact", action="store_true",
+            help="Записать без отступов (по объекту на строку).",
+        )
 
+    def handle(self, *args, **options):
+        # файл читается построчно дважды: сначала собираются названия
+        # ингредиентов и категорий, затем рецепты сразу записываются в json
         recipes_ingredients = set()
         recipes_categories = set()
 
-        for recipe in recipes_full:
-            for recipe_ingredient in recipe.get("ingredients").split(","):
-                recipes_ingredients.add(recipe_ingredient.split(":")[0])
-            for recipe_category in recipe.get("categories").split(","):
-                recipes_categories.add(recipe_category)
+        with open(recipes_csv, "r", encoding="utf-8", newline="") as csv_file:
+            for recipe in read_recipes(csv_file):
+                for recipe_ingredient in recipe.get("ingredients").split(","):
+                    recipes_ingredients.add(parse_ingredient(recipe_ingredient)[0])
+                for recipe_category in recipe.get("categories").split(","):
+                    recipes_categories.add(recipe_category)
 
         for main_category in "завтрак", "обед", "перекус", "ужин":
             recipes_categories.add(main_category)
@@ -50,62 +97,45 @@ class Command(BaseCommand):
             category: item for item, category in enumerate(recipes_categories, 1)
         }
 
-        ingredients = [
-            {
-                "model": "api.ingredient",
-                "id": item,
-                "fields": {
-                    "name": ingredient,
-                    "always_available": True
-                    if ingredient in always_available_ingredients
-                    else False
-                }
-            }
-            for ingredient, item in recipes_ingredients.items()
-        ]
-        categories = [
-            {"model": "api.category", "id": item, "fields": {"name": category}}
-            for category, item in recipes_categories.items()
-        ]
-
         recipes_in_db = Recipe.objects.all().values_list("id", flat=True).order_by("-id")
         last_recipe_id = recipes_in_db[0] if recipes_in_db else 0
-        recipes = list()
-        for item, recipe in enumerate(recipes_full, last_recipe_id + 1):
-            recipe_row = {
-                "model": "api.recipe",
-                "id": item,
-                "fields": {
-                    "name": recipe.get("name"),
-                    "cooking_time": recipe.get("cooking_time"),
-                    "description": recipe.get("description"),
-                    "categories": [
-                        recipes_categories.get(category_name)
-                        for category_name in recipe.get("categories").split(",")
-                    ]
-                }
-            }
-            recipes.append(recipe_row)
-            count_ingredients = [
-                {
-                    "model": "api.countingredients",
+
+        with FixtureWriter(options["output"], compact=options["compact"]) as fixture:
+            for ingredient, item in recipes_ingredients.items():
+                fixture.write({
+                    "model": "api.ingredient",
+                    "id": item,
                     "fields": {
-                        "recipe_id": item,
-                        "ingredient_id": recipes_ingredients.get(ingredient.split(":")[0]),
-                        "count": ingredient.split(":")[1],
-                        "optional": ingredient.split(":")[2]
+                        "name": ingredient,
+                        "always_available": ingredient in ALWAYS_AVAILABLE_INGREDIENTS,
                     }
-                }
-                for ingredient in recipe.get("ingredients").split(",")
-            ]
-            recipes.extend(count_ingredients)
-
-        with open(
-                os.path.join(data_dir, "recipes.json"), "w", encoding="utf-8"
-        ) as json_file:
-            json.dump(
-                ingredients + categories + recipes,
-                json_file,
-                indent=2,
-                ensure_ascii=False,
-            )
+                })
+            for category, item in recipes_categories.items():
+                fixture.write({"model": "api.category", "id": item, "fields": {"name": category}})
+
+            with open(recipes_csv, "r", encoding="utf-8", newline="") as csv_file:
+                for item, recipe in enumerate(read_recipes(csv_file), last_recipe_id + 1):
+                    fixture.write({
+                        "model": "api.recipe",
+                        "id": item,
+                        "fields": {
+                            "name": recipe.get("name"),
+                            "cooking_time": recipe.get("cooking_time"),
+                            "description": recipe.get("description"),
+                            "categories": [
+                                recipes_categories.get(category_name)
+                                for category_name in recipe.get("categories").split(",")
+                            ]
+                        }
+                    })
+                    for ingredient in recipe.get("ingredients").split(","):
+                        name, count, optional = parse_ingredient(ingredient)
+                        fixture.write({
+                            "model": "api.countingredients",
+                            "fields": {
+                                "recipe_id": item,
+                                "ingredient_id": recipes_ingredients.get(name),
+                                "count": count,
+                                "optional": optional,
+                            }
+                        })
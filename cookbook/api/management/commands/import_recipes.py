@@ -0,0 +1,43 @@
+import os
+
+from django.core.management import BaseCommand
+
+from cookbook.settings import BASE_DIR
+from api.importers import BATCH_SIZE, RecipeImporter
+from api.signals import reset_catalog
+
+data_dir = os.path.join(BASE_DIR, "api", "data")
+
+
+class Command(BaseCommand):
+    """Команда для потокового импорта рецептов из csv-файла в БД пакетами."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default=os.path.join(data_dir, "recipes.csv"),
+            help="CSV-файл с рецептами (разделитель ';').",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE,
+            help="Число строк в одном пакете.",
+        )
+        parser.add_argument(
+            "--atomic", action="store_true",
+            help="Весь импорт в одной транзакции (по умолчанию - транзакция на пакет).",
+        )
+
+    def handle(self, *args, **options):
+        def progress(count: int, speed: float) -> None:
+            self.stdout.write(f"\r{count} rows, {speed:.0f} rows/s", ending="")
+            self.stdout.flush()
+
+        importer = RecipeImporter(
+            batch_size=options["batch_size"], atomic=options["atomic"], progress=progress
+        )
+        with open(options["path"], "r", encoding="utf-8", newline="") as csv_file:
+            try:
+                count = importer.import_file(csv_file)
+            finally:
+                reset_catalog()
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"Imported {count} recipes."))
@@ -0,0 +1,99 @@
+import json
+import os
+from contextlib import contextmanager, nullcontext
+from time import monotonic
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from cookbook.settings import BASE_DIR
+from api.importers import BATCH_SIZE, RecipeImporter, load_fixture
+from api.models import Category, CountIngredients, Ingredient, Recipe
+from api.signals import reset_catalog
+
+data_dir = os.path.join(BASE_DIR, "api", "data")
+catalog_models = [Ingredient, Category, Recipe, Recipe.categories.through, CountIngredients]
+
+
+@contextmanager
+def without_indexes():
+    """
+    Удаление дополнительных индексов (Meta.indexes) моделей каталога
+    на время загрузки и их создание заново после нее.
+    """
+
+    indexes = [(model, index) for model in catalog_models for index in model._meta.indexes]
+    with connection.schema_editor() as schema_editor:
+        for model, index in indexes:
+            schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for model, index in indexes:
+                schema_editor.add_index(model, index)
+
+
+class Command(BaseCommand):
+    """
+    Команда для быстрой загрузки каталога рецептов в БД (вместо loaddata).
+
+    Принимает csv-файл с рецептами или json-фикстуру (csv_to_json) и
+    добавляет данные пакетными запросами в одной транзакции.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default=os.path.join(data_dir, "recipes.csv"),
+            help="CSV-файл с рецептами (разделитель ';') или json-фикстура.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE,
+            help="Число строк в одном запросе.",
+        )
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Удалить текущий каталог перед загрузкой (без нее каталог должен быть пуст).",
+        )
+        parser.add_argument(
+            "--drop-indexes", action="store_true",
+            help="Удалить дополнительные индексы на время загрузки и создать заново после нее.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+
+        # повторная загрузка в непустой каталог создала бы дубликаты
+        if not options["clear"] and any(
+            model.objects.exists() for model in (Ingredient, Category, Recipe)
+        ):
+            raise CommandError("The catalog is not empty. Use --clear to replace it.")
+
+        start = monotonic()
+        # индексы удаляются и создаются вне транзакции загрузки (SQLite
+        # не позволяет менять схему внутри транзакции с проверкой внешних ключей)
+        with without_indexes() if options["drop_indexes"] else nullcontext():
+            with transaction.atomic(), connection.cursor() as cursor:
+                if options["clear"]:
+                    tables = [model._meta.db_table for model in catalog_models]
+                    for sql in connection.ops.sql_flush(no_style(), tables, reset_sequences=True):
+                        cursor.execute(sql)
+                count = self.load(path, options["batch_size"])
+                # id из фикстуры заданы явно - последовательности нужно сдвинуть (PostgreSQL)
+                for sql in connection.ops.sequence_reset_sql(no_style(), catalog_models):
+                    cursor.execute(sql)
+        reset_catalog()
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {count} recipes in {monotonic() - start:.2f} s."
+        ))
+
+    def load(self, path: str, batch_size: int) -> int:
+        """Загрузка файла: json - как фикстуры, иначе - как csv с рецептами."""
+
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            if path.endswith(".json"):
+                return load_fixture(json.load(file), batch_size=batch_size)
+            return RecipeImporter(batch_size=batch_size).import_file(file)
@@ -0,0 +1,48 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .caching import CatalogIndex
+from .models import CountIngredients
+
+
+class RecipeMatchingEngine(CatalogIndex[Tuple[Dict[int, int], Dict[int, List[int]]]]):
+    """
+    Движок для подбора рецептов по ингредиентам в памяти.
+
+    Для каждого рецепта хранится битовая маска обязательных ингредиентов
+    (не optional и не always_available). Номер бита ингредиента выдается
+    при построении индекса; рецепты сгруппированы по маске, поэтому точное
+    совпадение находится одним поиском в словаре.
+    """
+
+    def load(self) -> Tuple[Dict[int, int], Dict[int, List[int]]]:
+        """Номера битов ингредиентов и id рецептов по маскам (один запрос)."""
+
+        bits = dict()
+        recipes = dict()
+        required_ingredients = CountIngredients.objects.filter(
+            optional=False, ingredient__always_available=False
+        ).values_list("recipe_id", "ingredient_id")
+        for recipe_id, ingredient_id in required_ingredients.iterator():
+            bit = bits.setdefault(ingredient_id, len(bits))
+            recipes[recipe_id] = recipes.get(recipe_id, 0) | 1 << bit
+        masks = dict()
+        for recipe_id, mask in recipes.items():
+            masks.setdefault(mask, list()).append(recipe_id)
+        return bits, masks
+
+    def only(self, ingredients: Iterable[int]) -> List[int]:
+        """Id рецептов, обязательные ингредиенты которых в точности совпадают с выбранными."""
+
+        bits, masks = self.get()
+        need = 0
+        for ingredient_id in ingredients:
+            if ingredient_id not in bits:
+                # ингредиент не обязателен ни в одном рецепте - совпадений нет
+                return list()
+            need |= 1 << bits[ingredient_id]
+        if not need:
+            return list()
+        return list(masks.get(need, ()))
+
+
+engine = RecipeMatchingEngine()
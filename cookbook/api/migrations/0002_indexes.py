@@ -0,0 +1,28 @@
+# Generated by Django 4.2.6 on 2026-10-18 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="category",
+            name="name",
+            field=models.CharField(max_length=30, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="ingredient",
+            name="name",
+            field=models.CharField(max_length=30, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="countingredients",
+            index=models.Index(
+                fields=["ingredient", "recipe"], name="api_countingredients_lookup"
+            ),
+        ),
+    ]
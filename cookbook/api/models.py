@@ -5,7 +5,7 @@ from django.db import models
 class Ingredient(models.Model):
     """Модель, описывающая ингредиент блюда."""
 
-    name = models.CharField(max_length=30, null=False)
+    name = models.CharField(max_length=30, null=False, unique=True)
     always_available = models.BooleanField(
         db_comment="Ингредиент, который всегда есть дома (н-р, соль, перец и т.п.).",
         default=0,
@@ -18,12 +18,26 @@ class Ingredient(models.Model):
 class Category(models.Model):
     """Модель, описывающая категорию блюда."""
 
-    name = models.CharField(max_length=30)
+    name = models.CharField(max_length=30, unique=True)
 
     def __str__(self):
         return f"{self.name}"
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов для модели Recipe."""
+
+    def with_ingredients(self) -> "RecipeQuerySet":
+        """Рецепты с подгруженными ингредиентами (для полной информации о рецепте)."""
+
+        return self.prefetch_related(
+            models.Prefetch(
+                "countingredients_set",
+                queryset=CountIngredients.objects.select_related("ingredient"),
+            )
+        )
+
+
 class Recipe(models.Model):
     """Модель, описывающая рецепт приготовления блюда."""
 
@@ -36,6 +50,8 @@ class Recipe(models.Model):
     categories = models.ManyToManyField(Category)
     image = models.CharField(max_length=300, null=True, blank=True)
 
+    objects = RecipeQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name}"
 
@@ -52,5 +68,13 @@ class CountIngredients(models.Model):
         db_comment="Ингредиент, необязательный в рецепте (н-р, для подачи)", default=0
     )
 
+    class Meta:
+        indexes = [
+            # поиск рецептов по ингредиентам (группировка по рецепту без чтения таблицы)
+            models.Index(
+                fields=["ingredient", "recipe"], name="api_countingredients_lookup"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.recipe.name}-{self.ingredient.name}"
@@ -0,0 +1,25 @@
+from typing import Tuple
+
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Постраничный вывод по курсору (по стабильному ключу).
+
+    Ключ сортировки задается атрибутом ordering представления ("id" по умолчанию)
+    и должен быть уникальным. Размер страницы - параметр page_size.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request: Request, queryset: QuerySet, view=None) -> Tuple[str, ...]:
+        ordering = getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
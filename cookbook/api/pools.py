@@ -0,0 +1,43 @@
+from array import array
+from random import choice
+from typing import Dict, Optional, Tuple
+
+from .caching import CatalogIndex
+from .models import Recipe
+
+
+class RecipePool(CatalogIndex[Tuple[array, Dict[str, array]]]):
+    """
+    Пулы id существующих рецептов для случайной выборки.
+
+    Id хранятся в массивах (общий пул и пулы по названиям категорий),
+    поэтому выбор случайного рецепта не зависит от пропусков в id
+    и не требует запроса к БД.
+    """
+
+    def load(self) -> Tuple[array, Dict[str, array]]:
+        """Общий пул и пулы по категориям (два запроса)."""
+
+        ids = array("q", Recipe.objects.values_list("id", flat=True).iterator())
+        categories = dict()
+        recipes_categories = Recipe.categories.through.objects.values_list(
+            "category__name", "recipe_id"
+        )
+        for category_name, recipe_id in recipes_categories.iterator():
+            categories.setdefault(category_name, array("q")).append(recipe_id)
+        return ids, categories
+
+    def choice(self, category: Optional[str] = None) -> Optional[int]:
+        """
+        Получение id случайного рецепта (из всех либо из категории по названию).
+
+        None - если подходящих рецептов нет.
+        """
+
+        ids, categories = self.get()
+        if category is not None:
+            ids = categories.get(category)
+        return choice(ids) if ids else None
+
+
+recipe_pool = RecipePool()
@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Count, QuerySet
+
+from .matching import engine
+from .models import Category, CountIngredients, Recipe
+from .pools import recipe_pool
+
+MEALS = {
+    "breakfast": "завтрак",
+    "lunch": "обед",
+    "snack": "перекус",
+    "dinner": "ужин",
+}
+
+
+def get_random_recipe() -> Optional[Recipe]:
+    """Случайный рецепт с ингредиентами. None - если рецептов нет."""
+
+    recipes = Recipe.objects.with_ingredients()
+    for _ in range(2):
+        recipe_id = recipe_pool.choice()
+        if recipe_id is None:
+            break
+        try:
+            return recipes.get(id=recipe_id)
+        except Recipe.DoesNotExist:
+            # рецепт удален в обход сигналов - обновляем пул
+            recipe_pool.invalidate()
+    return None
+
+
+def get_recipe(recipe_id: int) -> Recipe:
+    """Рецепт с ингредиентами по id."""
+
+    return Recipe.objects.with_ingredients().get(id=recipe_id)
+
+
+def get_menu_day() -> Dict[str, Optional[Recipe]]:
+    """Меню на день: по случайному рецепту на каждый прием пищи."""
+
+    recipes = Recipe.objects.with_ingredients()
+    for _ in range(2):
+        recipes_id = {meal: recipe_pool.choice(category) for meal, category in MEALS.items()}
+        need_ids = {recipe_id for recipe_id in recipes_id.values() if recipe_id}
+        recipes_obj = recipes.in_bulk(need_ids)
+        if len(recipes_obj) == len(need_ids):
+            break
+        # рецепт удален в обход сигналов - обновляем пулы
+        recipe_pool.invalidate()
+    return {meal: recipes_obj.get(recipe_id) for meal, recipe_id in recipes_id.items()}
+
+
+def get_categories() -> QuerySet:
+    """Все категории блюд по алфавиту."""
+
+    return Category.objects.all().order_by("name")
+
+
+def get_recipes_by_categories(categories: Iterable[int], select: bool = False) -> QuerySet:
+    """
+    Рецепты из выбранных категорий.
+
+    select - только рецепты, входящие во все выбранные категории сразу.
+    """
+
+    categories = set(categories)
+    recipes = Recipe.objects.filter(categories__id__in=categories)
+    if not select:
+        return recipes.distinct()
+    return recipes.annotate(categories_count=Count("categories", distinct=True)).filter(
+        categories_count=len(categories)
+    )
+
+
+def get_recipes_by_ingredients(ingredients: Iterable[int], only: bool = False) -> QuerySet:
+    """
+    Рецепты, содержащие все выбранные ингредиенты.
+
+    only - рецепты, обязательные ингредиенты которых в точности совпадают с выбранными.
+    """
+
+    ingredients = set(ingredients)
+    if only:
+        return Recipe.objects.filter(id__in=engine.only(ingredients))
+
+    recipes_id = (
+        CountIngredients.objects.filter(ingredient_id__in=ingredients)
+        .values("recipe_id")
+        .annotate(ingredients_count=Count("ingredient_id", distinct=True))
+        .filter(ingredients_count=len(ingredients))
+        .values("recipe_id")
+    )
+    return Recipe.objects.filter(id__in=recipes_id)
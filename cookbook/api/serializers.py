@@ -4,6 +4,8 @@ from rest_framework.serializers import ModelSerializer, Serializer, ListField
 
 from .models import Category, CountIngredients, Ingredient, Recipe
 
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщэюя"
+
 
 class IngredientNameSerializer(ModelSerializer):
     """Сериализатор для преобразования данных модели Ingredient. Только название."""
@@ -25,13 +27,14 @@ class IngredientAllSerializer(Serializer):
     """
     Сериализатор для представления всех ингредиентов модели Ingredient.
 
-    По первым буквам.
+    По первым буквам. Используется для описания схемы API: сами данные
+    отдаются из заранее построенного индекса.
     """
 
     def get_fields(self):
         return {
             symbol: ListField(child=IngredientShortSerializer())
-            for symbol in "абвгдежзийклмнопрстуфхцчшщэюя"
+            for symbol in ALPHABET
         }
 
 
@@ -0,0 +1,32 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_catalog_version
+from .models import Category, CountIngredients, Ingredient, Recipe
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=CountIngredients)
+@receiver(post_delete, sender=CountIngredients)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+@receiver(m2m_changed, sender=Recipe.categories.through)
+def catalog_changed(sender, **kwargs) -> None:
+    """Обработчик изменений моделей каталога."""
+
+    reset_catalog()
+
+
+def reset_catalog() -> None:
+    """
+    Сброс данных, построенных по каталогу (ответы в кэше, индексы в памяти).
+
+    Вызывается явно после массовых операций, которые не отправляют сигналы
+    (bulk_create и т.п.).
+    """
+
+    bump_catalog_version()
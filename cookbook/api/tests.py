@@ -1,7 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.shortcuts import reverse
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 
+from .admin import IngredientAdmin, RecipeAdmin
+from .caching import get_catalog_version
+from .letters import ingredient_letters
+from .management.commands.csv_to_json import FixtureWriter
+from .matching import engine
 from .models import Category, CountIngredients, Ingredient, Recipe
+from .pools import recipe_pool
+
+# отдельный файловый кэш для тестов (общий с процессами, запущенными из тестов)
+cache_dir = TemporaryDirectory()
+test_caches = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": cache_dir.name,
+    }
+}
 
 categories = [
     Category(id=1, name="завтрак"),
@@ -96,6 +123,7 @@ count_ingredients = [
 ]
 
 
+@override_settings(CACHES=test_caches)
 class TestCookbook(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -108,6 +136,12 @@ class TestCookbook(TestCase):
             recipe_obj.categories.set(recipes_categories[recipe_obj.id])
         CountIngredients.objects.bulk_create(count_ingredients)
 
+    def setUp(self):
+        cache.clear()
+        engine.invalidate()
+        recipe_pool.invalidate()
+        ingredient_letters.invalidate()
+
     def test_random_recipe(self):
         response = self.client.get(reverse("api:random_recipe"))
         self.assertEqual(response.status_code, 200)
@@ -115,11 +149,39 @@ class TestCookbook(TestCase):
             with self.subTest(value):
                 self.assertIn(value, response.data)
 
+    def test_random_recipe_with_gaps(self):
+        Recipe.objects.exclude(id=7).delete()
+        recipe_pool.build()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("api:random_recipe"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.get("name"), "рецепт7")
+
     def test_recipes_full(self):
         response = self.client.get(reverse("api:recipes_full", kwargs={"id": 1}))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("name"), "рецепт1")
 
+    def test_recipes_full_queries(self):
+        recipe = Recipe.objects.create(
+            name="рецепт8", cooking_time=30, description="ываываыва"
+        )
+        new_ingredients = Ingredient.objects.bulk_create(
+            [Ingredient(name=f"ингредиент{item}") for item in range(25)]
+        )
+        CountIngredients.objects.bulk_create(
+            [
+                CountIngredients(recipe=recipe, ingredient=ingredient, count="1 шт.")
+                for ingredient in new_ingredients
+            ]
+        )
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("api:recipes_full", kwargs={"id": recipe.id})
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data.get("ingredients")), 25)
+
     def test_menu_day(self):
         response = self.client.get(reverse("api:menu_day"))
         self.assertEqual(response.status_code, 200)
@@ -128,38 +190,148 @@ class TestCookbook(TestCase):
                 self.assertIn(eating, response.data)
                 self.assertIsNotNone(response.data.get(eating))
 
+    def test_menu_day_empty_category(self):
+        Category.objects.filter(name="перекус").delete()
+        response = self.client.get(reverse("api:menu_day"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_menu_day_queries(self):
+        recipe_pool.build()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("api:menu_day"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["breakfast"]["name"][:6], "рецепт")
+
     def test_categories(self):
         response = self.client.get(reverse("api:categories"))
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 12)
+        self.assertEqual(len(response.data["results"]), 12)
+
+    def test_categories_cache(self):
+        self.client.get(reverse("api:categories"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("api:categories"))
+        self.assertEqual(len(response.data["results"]), 12)
+
+        Category.objects.create(name="выпечка")
+        response = self.client.get(reverse("api:categories"))
+        self.assertEqual(len(response.data["results"]), 13)
+
+    def test_categories_changed_in_other_process(self):
+        self.client.get(reverse("api:categories"))
+        version = get_catalog_version()
+        Category.objects.bulk_create([Category(name="выпечка")])
+        subprocess.run(
+            [sys.executable, "manage.py", "shell", "-c",
+             "from api.signals import reset_catalog; reset_catalog()"],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                "CACHE_BACKEND": test_caches["default"]["BACKEND"],
+                "CACHE_LOCATION": cache_dir.name,
+            },
+            check=True,
+        )
+        self.assertNotEqual(get_catalog_version(), version)
+        response = self.client.get(reverse("api:categories"))
+        self.assertEqual(len(response.data["results"]), 13)
+
+    def test_categories_not_modified(self):
+        response = self.client.get(reverse("api:categories"))
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        self.assertIsNotNone(response.headers.get("Last-Modified"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("api:categories"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.create(name="выпечка")
+        response = self.client.get(reverse("api:categories"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+
+    def test_categories_pages(self):
+        names = list()
+        url = reverse("api:categories")
+        params = {"page_size": 5}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 5)
+            names.extend(category["name"] for category in response.data["results"])
+            url, params = response.data["next"], None
+        self.assertEqual(names, sorted(category.name for category in categories))
+
+    @override_settings(ALLOWED_HOSTS=["public.example", "web"])
+    def test_categories_pages_host(self):
+        url = reverse("api:categories")
+        params = {"page_size": 5}
+        for host in "public.example", "web:8000":
+            response = self.client.get(url, params, HTTP_HOST=host)
+            self.assertTrue(response.data["next"].startswith(f"http://{host}/"))
 
     def test_recipes_categories_aside(self):
         response = self.client.get(
             reverse("api:recipes_categories_aside"), {"categories": "1,7"}
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 6)
+        self.assertEqual(len(response.data["results"]), 6)
 
     def test_recipes_categories_select(self):
-        response = self.client.get(
-            reverse("api:recipes_categories_select"), {"categories": "1,2"}
-        )
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("api:recipes_categories_select"), {"categories": "1,2"}
+            )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_recipes_ingredients_in(self):
         response = self.client.get(
             reverse("api:recipes_ingredients_in"), {"ingredients": "5"}
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 4)
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_recipes_ingredients_in_several(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("api:recipes_ingredients_in"), {"ingredients": "5,1"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_recipes_ingredients_only(self):
         response = self.client.get(
             reverse("api:recipes_ingredients_only"), {"ingredients": "5"}
         )
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_recipes_ingredients_only_after_change(self):
+        count_ingredient = CountIngredients.objects.get(id=2)
+        count_ingredient.optional = True
+        count_ingredient.save()
+        response = self.client.get(
+            reverse("api:recipes_ingredients_only"), {"ingredients": "5"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_recipes_bad_ids(self):
+        for name, param in (
+            ("api:recipes_categories_aside", "categories"),
+            ("api:recipes_categories_select", "categories"),
+            ("api:recipes_ingredients_in", "ingredients"),
+            ("api:recipes_ingredients_only", "ingredients"),
+        ):
+            for params in {}, {param: ""}, {param: "1,a"}:
+                with self.subTest(name, params=params):
+                    response = self.client.get(reverse(name), params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(param, response.data)
 
     def test_ingredients_startswith(self):
         response = self.client.get(
@@ -167,3 +339,169 @@ class TestCookbook(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data), 2)
+
+    def test_ingredients_all(self):
+        response = self.client.get(reverse("api:ingredients_startswith"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 29)
+        self.assertEqual(
+            [ingredient["name"] for ingredient in response.data["к"]],
+            ["картофель", "курица"],
+        )
+
+        Ingredient.objects.create(name="кабачок")
+        response = self.client.get(
+            reverse("api:ingredients_startswith"), {"startswith": "к"}
+        )
+        self.assertEqual(len(response.data), 3)
+
+    def test_recipes_import(self):
+        csv_file = StringIO(
+            "name;cooking_time;description;ingredients;categories\n"
+            "рецепт8;10;ываыва;курица:1 шт.:False,кабачок:2 шт.:True;обед,суп,обед\n"
+            "рецепт9;15;ывафыв;кабачок:1 шт.:False,соль:по вкусу:False;десерт\n"
+        )
+        with self.assertNumQueries(9):
+            result = RecipeAdmin(Recipe, admin.site).upload_data_to_db(csv_file)
+        self.assertTrue(result)
+
+        recipe = Recipe.objects.get(name="рецепт8")
+        self.assertEqual(
+            sorted(recipe.categories.values_list("name", flat=True)), ["обед", "суп"]
+        )
+        self.assertEqual(
+            sorted(recipe.countingredients_set.values_list("ingredient__name", "optional")),
+            [("кабачок", True), ("курица", False)],
+        )
+        self.assertTrue(Category.objects.filter(name="десерт").exists())
+        self.assertEqual(Ingredient.objects.filter(name="кабачок").count(), 1)
+
+    def test_ingredients_import(self):
+        csv_file = StringIO(
+            "name,always_available\n"
+            "Перец черный,False\n"
+            "кабачок,False\n"
+            "Кабачок,True\n"
+            "курица,False\n"
+        )
+        with self.assertNumQueries(5):
+            result = IngredientAdmin(Ingredient, admin.site).upload_data_to_db(csv_file)
+        self.assertTrue(result)
+        self.assertEqual(Ingredient.objects.count(), len(ingredients) + 1)
+        self.assertFalse(Ingredient.objects.get(id=4).always_available)
+        self.assertFalse(Ingredient.objects.get(name="кабачок").always_available)
+
+    def test_load_catalog(self):
+        fixture = os.path.join(settings.BASE_DIR, "api", "data", "recipes.json")
+        call_command("load_catalog", fixture, "--clear", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 90)
+        self.assertEqual(CountIngredients.objects.count(), 809)
+        self.assertFalse(Recipe.objects.filter(name="рецепт1").exists())
+
+    def test_load_catalog_not_empty(self):
+        with self.assertRaises(CommandError):
+            call_command("load_catalog", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), len(recipes))
+
+    def test_fixture_writer(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recipes.json")
+            with FixtureWriter(path) as fixture:
+                fixture.write({"model": "api.category", "id": 1, "fields": {"name": "обед"}})
+            with self.assertRaises(ValueError):
+                with FixtureWriter(path, compact=True) as fixture:
+                    fixture.write({"model": "api.category", "id": 2, "fields": {"name": "ужин"}})
+                    raise ValueError("bad row")
+            with open(path, encoding="utf-8") as json_file:
+                self.assertEqual(json.load(json_file)[0]["fields"]["name"], "обед")
+            self.assertEqual(os.listdir(directory), ["recipes.json"])
+
+    def test_fixture_writer_line_separators(self):
+        obj = {"model": "api.recipe", "id": 1, "fields": {"description": "а\u2028б\u2029в\x85г\nд"}}
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recipes.json")
+            with FixtureWriter(path) as fixture:
+                fixture.write(obj)
+            with open(path, encoding="utf-8") as json_file:
+                self.assertEqual(json.load(json_file), [obj])
+            with open(path, encoding="utf-8", newline="") as json_file:
+                self.assertEqual(json_file.read(), json.dumps([obj], ensure_ascii=False, indent=2))
+
+
+@override_settings(CACHES=test_caches)
+class TestLoadCatalog(TransactionTestCase):
+    def test_load_catalog_csv(self):
+        call_command("load_catalog", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 90)
+        self.assertEqual(CountIngredients.objects.count(), 809)
+
+        call_command("load_catalog", "--clear", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 90)
+
+    def test_load_catalog_running_server(self):
+        # ответы и пулы рецептов, построенные по пустому каталогу до загрузки
+        self.assertEqual(self.client.get(reverse("api:random_recipe")).status_code, 404)
+        self.assertEqual(self.client.get(reverse("api:categories")).data["results"], [])
+
+        call_command("load_catalog", stdout=StringIO())
+        self.assertEqual(self.client.get(reverse("api:random_recipe")).status_code, 200)
+        self.assertEqual(len(self.client.get(reverse("api:categories")).data["results"]), 20)
+        response = self.client.get(reverse("api:menu_day"))
+        for eating in "breakfast", "lunch", "snack", "dinner":
+            with self.subTest(eating):
+                self.assertIsNotNone(response.data.get(eating))
+
+    def test_load_catalog_drop_indexes(self):
+        call_command("load_catalog", "--drop-indexes", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 90)
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, CountIngredients._meta.db_table
+            )
+        self.assertIn("api_countingredients_lookup", constraints)
+
+
+@override_settings(CACHES=test_caches)
+class TestImportRecipes(TransactionTestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "recipes.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_csv(self, *rows):
+        with open(self.path, "w", encoding="utf-8") as csv_file:
+            csv_file.write("name;cooking_time;description;ingredients;categories\n")
+            csv_file.writelines(f"{row}\n" for row in rows)
+
+    def test_import_recipes(self):
+        self.assertEqual(self.client.get(reverse("api:random_recipe")).status_code, 404)
+        self.write_csv(
+            "рецепт1;10;ываыва;курица:1 шт.:False;обед",
+            "рецепт2;15;ывафыв;кабачок:1 шт.:False;ужин",
+            "рецепт3;20;фывфыв;соль:по вкусу:False;обед",
+        )
+        stdout = StringIO()
+        call_command("import_recipes", self.path, "--batch-size", "2", stdout=stdout)
+        self.assertEqual(Recipe.objects.count(), 3)
+        # прогресс после каждого пакета: число строк и скорость
+        self.assertRegex(stdout.getvalue(), r"\r2 rows, \d+ rows/s\r3 rows, \d+ rows/s")
+        self.assertIn("Imported 3 recipes.", stdout.getvalue())
+        self.assertEqual(self.client.get(reverse("api:random_recipe")).status_code, 200)
+
+    def test_import_recipes_batches(self):
+        # ошибка во втором пакете: первый пакет уже зафиксирован
+        self.write_csv("рецепт1;10;ываыва;курица:1 шт.:False;обед", "рецепт2;15;ывафыв;кабачок;ужин")
+        with self.assertRaises(ValueError):
+            call_command("import_recipes", self.path, "--batch-size", "1", stdout=StringIO())
+        self.assertEqual(list(Recipe.objects.values_list("name", flat=True)), ["рецепт1"])
+
+    def test_import_recipes_atomic(self):
+        self.write_csv("рецепт1;10;ываыва;курица:1 шт.:False;обед", "рецепт2;15;ывафыв;кабачок;ужин")
+        with self.assertRaises(ValueError):
+            call_command(
+                "import_recipes", self.path, "--batch-size", "1", "--atomic", stdout=StringIO()
+            )
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Category.objects.exists())
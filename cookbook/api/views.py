@@ -1,14 +1,32 @@
-from random import choice, randint
-from typing import Dict, List
+from typing import Dict, Mapping, Set
 
+from django.http import Http404
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework.generics import GenericAPIView, ListAPIView, QuerySet, RetrieveAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, QuerySet, RetrieveAPIView
+from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models import Category, CountIngredients, Ingredient, Recipe
+from . import queries
+from .caching import CachedResponseMixin, ConditionalGetMixin
+from .letters import ingredient_letters
+from .models import Recipe
 from .serializers import (CategorySerializer, IngredientAllSerializer,
-                          IngredientShortSerializer, MenuDaySerializer,
-                          RecipeFullSerializer, RecipeShortSerializer)
+                          MenuDaySerializer, RecipeFullSerializer,
+                          RecipeShortSerializer)
+
+
+def parse_ids(params: Mapping[str, str], name: str) -> Set[int]:
+    """
+    Функция для получения id из параметра запроса name (через запятую).
+
+    Отсутствующий, пустой или нечисловой параметр - ответ 400.
+    """
+
+    try:
+        return {int(item) for item in params[name].split(",")}
+    except (KeyError, ValueError):
+        raise ValidationError({name: "Expected comma-separated ids."})
 
 
 class RandomRecipeView(RetrieveAPIView):
@@ -17,19 +35,23 @@ class RandomRecipeView(RetrieveAPIView):
     serializer_class = RecipeFullSerializer
 
     def get_object(self) -> Recipe:
-        count = Recipe.objects.count()
-        random_id = randint(1, count)
-        return Recipe.objects.get(id=random_id)
+        recipe = queries.get_random_recipe()
+        if recipe is None:
+            raise Http404
+        return recipe
 
 
-class RecipeView(RetrieveAPIView):
+class RecipeView(ConditionalGetMixin, RetrieveAPIView):
     """Получение рецепта по id."""
 
     serializer_class = RecipeFullSerializer
 
     def get_object(self) -> Recipe:
         recipe_id = self.kwargs.get("id")
-        return Recipe.objects.get(id=recipe_id)
+        try:
+            return queries.get_recipe(recipe_id)
+        except Recipe.DoesNotExist:
+            raise Http404
 
 
 class MenuDayView(RetrieveAPIView):
@@ -38,126 +60,82 @@ class MenuDayView(RetrieveAPIView):
     serializer_class = MenuDaySerializer
 
     def get_object(self) -> Dict[str, Recipe]:
-        return {
-            "breakfast": self.get_recipe("завтрак"),
-            "lunch": self.get_recipe("обед"),
-            "snack": self.get_recipe("перекус"),
-            "dinner": self.get_recipe("ужин"),
-        }
-
-    @staticmethod
-    def get_recipe(name: str) -> Recipe:
-        return choice(Recipe.objects.filter(categories__name=name))
+        menu = queries.get_menu_day()
+        # в категории одного из приемов пищи нет рецептов - меню не составить
+        if None in menu.values():
+            raise Http404
+        return menu
 
 
-class CategoriesView(ListAPIView):
+class CategoriesView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
     """Получение всех категорий блюд."""
 
     serializer_class = CategorySerializer
+    ordering = "name"
 
     def get_queryset(self) -> QuerySet:
-        return Category.objects.all().order_by("name")
+        return queries.get_categories()
 
 
 @extend_schema(parameters=[OpenApiParameter(name="categories", default="1,2,3")])
-class RecipesCategoriesAsideView(ListAPIView):
+class RecipesCategoriesAsideView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
     """Получение отдельных блюд из выбранных категорий."""
 
     serializer_class = RecipeShortSerializer
 
     def get_queryset(self) -> QuerySet:
-        categories = self.request.query_params.get("categories").split(",")
-        return Recipe.objects.filter(categories__id__in=categories).distinct()
+        categories = parse_ids(self.request.query_params, "categories")
+        return queries.get_recipes_by_categories(categories)
 
 
 @extend_schema(parameters=[OpenApiParameter(name="categories", default="1,2,3")])
-class RecipesCategoriesSelectView(ListAPIView):
+class RecipesCategoriesSelectView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
     """Получение блюд, совпадающих по всем категориям сразу."""
 
     serializer_class = RecipeShortSerializer
 
-    def get_queryset(self) -> List[Recipe]:
-        categories = [
-            int(category)
-            for category in self.request.query_params.get("categories").split(",")
-        ]
-        recipes = Recipe.objects.filter(categories__id__in=categories).distinct()
-        return [
-            recipe
-            for recipe in recipes
-            if set([category.id for category in recipe.categories.all()])
-               >= set(categories)
-        ]
+    def get_queryset(self) -> QuerySet:
+        categories = parse_ids(self.request.query_params, "categories")
+        return queries.get_recipes_by_categories(categories, select=True)
 
 
-@extend_schema(parameters=[OpenApiParameter(name="startswith", default="а",)])
-class IngredientsView(RetrieveAPIView):
-    """Получение всех ингредиентов по первой букве."""
+@extend_schema(
+    parameters=[OpenApiParameter(name="startswith", default="а", required=False)],
+    responses=IngredientAllSerializer,
+)
+class IngredientsView(ConditionalGetMixin, RetrieveAPIView):
+    """
+    Получение всех ингредиентов по первой букве.
 
-    serializer_class = IngredientAllSerializer
+    Если указан параметр startswith - только ингредиенты на эту букву.
+    """
 
-    def get_object(self):
-        ingredients_symbol = {symbol: list() for symbol in "абвгдежзийклмнопрстуфхцчшщэюя"}
-        for ingredient in self.get_queryset():
-            ingredients_symbol[ingredient.name[0]].append(ingredient)
-        return ingredients_symbol
+    serializer_class = IngredientAllSerializer
 
-    def get_queryset(self):
-        return Ingredient.objects.all().order_by("name")
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        symbol = request.query_params.get("startswith")
+        if symbol:
+            return Response(ingredient_letters.get_bucket(symbol))
+        return Response(ingredient_letters.get_all())
 
 
 @extend_schema(parameters=[OpenApiParameter(name="ingredients", default="1,2,3",)])
-class RecipesIngredientsInView(ListAPIView):
+class RecipesIngredientsInView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
     """Получение блюд с содержанием выбранных ингредиентов."""
 
     serializer_class = RecipeShortSerializer
 
-    def get_queryset(self) -> List[Recipe]:
-        need_ingredients = [
-            int(ingredient)
-            for ingredient in self.request.query_params.get("ingredients").split(",")
-        ]
-        count_ingredients = CountIngredients.objects.filter(
-            ingredient_id__in=need_ingredients
-        )
-
-        recipes_ingredients = dict()
-        for recipe_ingredient in count_ingredients:
-            recipes_ingredients.setdefault(recipe_ingredient.recipe, list())
-            recipes_ingredients[recipe_ingredient.recipe].append(
-                recipe_ingredient.ingredient.id
-            )
-
-        return [
-            recipe
-            for recipe, ingredients in recipes_ingredients.items()
-            if set(ingredients) >= set(need_ingredients)
-        ]
+    def get_queryset(self) -> QuerySet:
+        need_ingredients = parse_ids(self.request.query_params, "ingredients")
+        return queries.get_recipes_by_ingredients(need_ingredients)
 
 
 @extend_schema(parameters=[OpenApiParameter(name="ingredients", default="1,2,3",)])
-class RecipesIngredientsOnlyView(ListAPIView):
+class RecipesIngredientsOnlyView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
     """Получение блюд с содержанием только выбранных ингредиентов."""
 
     serializer_class = RecipeShortSerializer
 
-    def get_queryset(self) -> List[Recipe]:
-        need_ingredients = [
-            int(ingredient)
-            for ingredient in self.request.query_params.get("ingredients").split(",")
-        ]
-        recipes = Recipe.objects.filter(ingredients__id__in=need_ingredients).distinct()
-        select_recipes = list()
-
-        for recipe in recipes:
-            ingredients = [
-                ingredient.id for ingredient in recipe.ingredients.all()
-                if (
-                    not ingredient.count_ingredient.filter(recipe=recipe)
-                    .first().optional
-                    and not ingredient.always_available
-                )
-            ]
-            if set(ingredients) == set(need_ingredients):
-                select_recipes.append(recipe)
-        return select_recipes
+    def get_queryset(self) -> QuerySet:
+        need_ingredients = parse_ids(self.request.query_params, "ingredients")
+        return queries.get_recipes_by_ingredients(need_ingredients, only=True)
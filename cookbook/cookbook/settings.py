@@ -89,6 +89,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# The catalog version stored in this cache invalidates cached responses and
+# in-memory indexes, so the cache must be shared by all processes (server
+# workers, management commands, the embedded bot). Do not use LocMemCache.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 10000)),
+        },
+    }
+}
+
+# Lifetime of cached API responses in seconds.
+# Cached responses are also dropped on any catalog change.
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -135,5 +158,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema"
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("API_PAGE_SIZE", 50)),
 }
+
+# Upper bound for the page_size query parameter of list endpoints.
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 500))